@@ -3,20 +3,42 @@ Programa interactivo: Historia y evolución de la graficación por computadora
 Con síntesis de voz (Text-to-Speech) y mejoras visuales
 Autor: Sistema Mejorado
 Descripción:
- - Interfaz Tkinter con línea del tiempo por décadas
+ - Interfaz Tkinter con línea del tiempo por décadas (datos y búsqueda en timeline_core.py)
  - Filtros por década, búsqueda, navegación
- - Exportación a CSV/JSON
- - Cuestionario (8 preguntas) con puntaje
+ - Exportación a CSV/JSON/JSON Lines y binario por columnas (opcionalmente comprimida)
+ - Cuestionario (8 preguntas) con puntaje, generado de los hitos con una semilla
+ - Catálogo de hitos y cuestionario externos (CSV/JSON), con caché binaria mapeada en memoria
  - NUEVO: Síntesis de voz para leer el contenido
  - NUEVO: Colores mejorados y diseño moderno
+ - Panel de rendimiento (F12) y traza JSON de tiempos (--trace)
  - Opcional: carga de imágenes locales si existe Pillow (PIL) y archivos en ./assets/
 """
+import argparse
+import hashlib
+import importlib.util
 import json
-import csv
 import os
+import subprocess
+import sys
+import time
+import wave
 import tkinter as tk
+import tkinter.font as tkfont
 from tkinter import ttk, messagebox, filedialog
+import itertools
+import queue
+import random
 import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# Datos, búsqueda, catálogos y exportación (sin interfaz)
+from timeline_core import (
+    CATALOG_CACHE_DIR, EXPORT_FORMATS, QUIZ_LENGTH, TRACER,
+    Catalog, IncrementalSearch,
+    decade_label, grade_quiz, open_export, split_export_path, split_sentences,
+    write_columnar, write_csv, write_json, write_jsonl,
+)
 
 # Intento opcional de cargar Pillow para imágenes
 try:
@@ -25,12 +47,10 @@ try:
 except Exception:
     PIL_AVAILABLE = False
 
-# Intento de cargar pyttsx3 para síntesis de voz
-try:
-    import pyttsx3
-    TTS_AVAILABLE = True
-except Exception:
-    TTS_AVAILABLE = False
+# pyttsx3 (síntesis de voz) se importa en el hilo de voz, no al arrancar:
+# aquí sólo se revisa que esté instalado
+TTS_AVAILABLE = importlib.util.find_spec("pyttsx3") is not None
+if not TTS_AVAILABLE:
     print("⚠️ pyttsx3 no disponible. Instala con: pip install pyttsx3")
 
 # ---------------------------
@@ -53,188 +73,1050 @@ COLORS = {
     'accent': '#8b5cf6',         # Morado
 }
 
-# ---------------------------
-# Datos de la línea del tiempo
-# ---------------------------
-MILESTONES = [
-    (1950, "Pantallas CRT en investigación",
-     "Uso de tubos de rayos catódicos (CRT) en radares y simuladores; base para visualización electrónica.",
-     ["CRT", "visualización", "radares"], "crt.png"),
-    
-    (1957, "Primera imagen digitalizada (Kirsch)",
-     "Russell Kirsch digitaliza una fotografía con la computadora SEAC; inicio de la imagen digital.",
-     ["imagen digital", "SEAC", "Kirsch"], "kirsch.png"),
-    
-    (1963, "Sketchpad (Ivan Sutherland)",
-     "Sistema pionero CAD con lápiz óptico: selección, arrastre, zoom y estructuras jerárquicas de objetos.",
-     ["CAD", "Sketchpad", "interacción"], "sketchpad.png"),
-    
-    (1968, "Mother of All Demos (Engelbart)",
-     "Presentación de NLS: mouse, ventanas, hipervínculos, edición y colaboración; clave para interfaces gráficas.",
-     ["GUI", "NLS", "interfaz"], "nls.png"),
-    
-    (1972, "Pong",
-     "Uno de los primeros videojuegos comerciales; impulso a gráficos interactivos en tiempo real.",
-     ["videojuegos", "Atari"], "pong.png"),
-    
-    (1973, "SuperPaint",
-     "Primeros sistemas con frame buffer en color; edición y pintura digital temprana.",
-     ["raster", "framebuffer"], "superpaint.png"),
-    
-    (1984, "GUI en computadoras personales",
-     "Popularización de entornos gráficos (Macintosh) y posterior adopción masiva (Windows).",
-     ["GUI", "Mac", "Windows"], "gui80s.png"),
-    
-    (1992, "OpenGL",
-     "API estándar multiplataforma para gráficos 2D/3D; cataliza gráficos interactivos y científicos.",
-     ["OpenGL", "API", "3D"], "opengl.png"),
-    
-    (1995, "Toy Story",
-     "Primer largometraje completamente por animación 3D; hito de la industria CGI.",
-     ["cine", "CGI", "Pixar"], "toystory.png"),
-    
-    (1999, "GPUs y sombreadores programables",
-     "Las GPUs dan salto a programabilidad (shaders); rendimiento masivo en gráficos 3D.",
-     ["GPU", "shaders"], "gpu99.png"),
-    
-    (2006, "Programación de shaders consolidada",
-     "Sombreadores de vértice/píxel/geom. ampliamente usados en videojuegos y visualización.",
-     ["shaders", "programable"], "shaders.png"),
-    
-    (2018, "Ray tracing en tiempo real",
-     "Soporte de hardware para trazado de rayos en tiempo real (línea RTX); realismo de iluminación.",
-     ["ray tracing", "RTX"], "rtx.png"),
-    
-    (2020, "VR/AR y altas resoluciones",
-     "Aplicaciones inmersivas, 4K/8K, simulaciones complejas y uso transversal en ciencia, medicina y educación.",
-     ["VR", "AR", "4K/8K"], "vrar.png"),
-]
+ALL_DECADES = "Todas las décadas"
+ALL_TAGS = "Todas las etiquetas"
+TAG_MENU_LIMIT = 40   # Etiquetas más frecuentes que se muestran en el menú
 
 # ---------------------------
-# Preguntas del cuestionario
+# Búsqueda en segundo plano
 # ---------------------------
-QUIZ = [
-    {
-        "q": "¿Quién desarrolló Sketchpad, considerado pionero del CAD interactivo?",
-        "options": ["Ivan Sutherland", "Douglas Engelbart", "John Whitney", "Alan Kay"],
-        "answer": 0
-    },
-    {
-        "q": "¿Qué hito permitió iluminación más realista en tiempo real a partir de 2018?",
-        "options": ["Mapeado de normales", "Ray tracing con soporte de hardware", "Phong shading", "Wireframe puro"],
-        "answer": 1
-    },
-    {
-        "q": "¿Cuál fue uno de los primeros videojuegos comerciales que impulsó los gráficos interactivos?",
-        "options": ["Spacewar!", "Pong", "Breakout", "Doom"],
-        "answer": 1
-    },
-    {
-        "q": "OpenGL (1992) es principalmente...",
-        "options": ["Un sistema operativo", "Un lenguaje de shading propietario",
-                    "Una API estándar para gráficos", "Un formato de imagen"],
-        "answer": 2
-    },
-    {
-        "q": "La 'Mother of All Demos' (1968) mostró:",
-        "options": ["Pantallas táctiles capacitivas", "Mouse, ventanas e hipervínculos",
-                    "Headsets de VR comerciales", "Smartphones"],
-        "answer": 1
-    },
-    {
-        "q": "Toy Story (1995) es relevante porque:",
-        "options": ["Fue la primera película en 3D estereoscópico",
-                    "Fue el primer largometraje totalmente hecho con animación 3D",
-                    "Usó por primera vez GPUs programables",
-                    "Se dibujó a mano y luego se digitalizó"],
-        "answer": 1
-    },
-    {
-        "q": "Las GPUs programables popularizaron el uso de:",
-        "options": ["Shaders", "Disquetes", "Microfilms", "Tubos de vacío"],
-        "answer": 0
-    },
-    {
-        "q": "SuperPaint aportó tempranamente:",
-        "options": ["Ray tracing en tiempo real", "Render de path tracing",
-                    "Frame buffer en color y pintura digital", "Pantallas OLED"],
-        "answer": 2
-    },
-]
-
-
-def decade_label(year: int) -> str:
-    d = (year // 10) * 10
-    return f"{d}s"
+SEARCH_DEBOUNCE_MS = 150   # Espera tras la última tecla antes de buscar
+
+
+class SearchPipeline:
+    """Ejecuta las búsquedas en un hilo de trabajo sin bloquear la interfaz.
+
+    Las peticiones con retardo se agrupan (debounce): cada tecla reinicia la
+    espera. El hilo de trabajo sólo atiende la petición más reciente y el
+    resultado se aplica en el hilo de Tk con ``after()``; si mientras tanto
+    llegó una petición nueva, el resultado viejo se descarta.
+    """
+
+    def __init__(self, widget: tk.Misc, search_fn):
+        self.widget = widget
+        self.search_fn = search_fn
+        self.generation = 0
+        self._after_id = None
+        self._pending = None
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def request(self, args, callback, delay_ms=0):
+        """Programa ``search_fn(*args)``; ``callback(resultado)`` corre en el hilo de Tk"""
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+        if delay_ms:
+            self._after_id = self.widget.after(delay_ms, self._submit, args, callback)
+        else:
+            self._submit(args, callback)
+
+    def _submit(self, args, callback):
+        self._after_id = None
+        with self._cond:
+            self.generation += 1
+            self._pending = (self.generation, args, callback)
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None:
+                    self._cond.wait()
+                generation, args, callback = self._pending
+                self._pending = None
+            try:
+                result = self.search_fn(*args)
+            except Exception as e:
+                print(f"Error en búsqueda: {e}")
+                continue
+            try:
+                self.widget.after(0, self._deliver, generation, result, callback)
+            except RuntimeError:
+                # La ventana ya se cerró
+                return
+
+    def _deliver(self, generation, result, callback):
+        if generation == self.generation:
+            callback(result)
 
 
 # ---------------------------
 # Motor de Text-to-Speech
 # ---------------------------
+def _init_com():
+    """En Windows, SAPI (usado por pyttsx3) requiere inicializar COM en cada hilo"""
+    if sys.platform == "win32":
+        try:
+            import comtypes
+            comtypes.CoInitialize()
+        except Exception:
+            pass
+
+
+TTS_RATE = 150          # Velocidad por defecto (palabras por minuto)
+TTS_VOLUME = 0.9        # Volumen (0.0 a 1.0)
+TTS_CACHE_DIR = ".ttscache"
+TTS_VOICE_CACHE = ".tts_voice.json"   # Voz elegida en el primer arranque
+TTS_START_DELAY_MS = 300              # El motor de voz se crea después de mostrar la ventana
+AUDIO_EXT = ".aiff" if sys.platform == "darwin" else ".wav"
+
+
+def narration_text(year, title, desc) -> str:
+    """Texto que se lee en voz alta para un hito"""
+    return f"{title}. Año {year}. {desc}"
+
+
+def _configure_engine(engine, rate=TTS_RATE, volume=TTS_VOLUME, voice_cache=TTS_VOICE_CACHE):
+    """Aplica velocidad y volumen, y elige una voz en español si existe.
+
+    La voz elegida se guarda en ``voice_cache`` para no recorrer todas las
+    voces instaladas en cada arranque.
+    """
+    engine.setProperty('rate', rate)
+    engine.setProperty('volume', volume)
+
+    try:
+        with open(voice_cache, encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        cached = None
+    if isinstance(cached, dict) and "voice" in cached:
+        try:
+            if cached["voice"]:
+                engine.setProperty('voice', cached["voice"])
+            return
+        except Exception:
+            pass  # La voz guardada ya no existe: buscar de nuevo
+
+    voice_id = None
+    for voice in engine.getProperty('voices'):
+        languages = [str(lang).lower() for lang in (voice.languages or [])]
+        if 'spanish' in voice.name.lower() or any('spanish' in lang for lang in languages):
+            voice_id = voice.id
+            engine.setProperty('voice', voice_id)
+            break
+    try:
+        with open(voice_cache, "w", encoding="utf-8") as f:
+            json.dump({"voice": voice_id}, f)
+    except OSError:
+        pass
+
+
+class NarrationCache:
+    """Narraciones ya sintetizadas, guardadas como archivos de audio.
+
+    Cada archivo se nombra con un hash del texto, la voz y la velocidad; si
+    cambia cualquiera de los tres se usa (y se genera) otra entrada.
+    """
+
+    def __init__(self, directory=TTS_CACHE_DIR):
+        self.directory = directory
+
+    def path_for(self, text, voice, rate):
+        key = f"{voice}|{rate}|{text}"
+        return os.path.join(self.directory, hashlib.sha1(key.encode("utf-8")).hexdigest() + AUDIO_EXT)
+
+    def lookup(self, text, voice, rate):
+        path = self.path_for(text, voice, rate)
+        return path if os.path.exists(path) else None
+
+    def render(self, engine, texts, voice, rate, interrupt=None):
+        """Sintetiza ``texts`` a archivos con ``engine`` (en una sola pasada).
+
+        Los archivos se escriben con otro nombre y sólo pasan a la caché si
+        ``runAndWait`` terminó sin que se activara ``interrupt``; si no, se
+        borran para no guardar audio cortado. Retorna si se guardaron.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        pending = []
+        completed = False
+        try:
+            for text in texts:
+                path = self.path_for(text, voice, rate)
+                tmp = f"{path[:-len(AUDIO_EXT)]}.{os.getpid()}.tmp{AUDIO_EXT}"
+                engine.save_to_file(text, tmp)
+                pending.append((tmp, path))
+            engine.runAndWait()
+            completed = interrupt is None or not interrupt.is_set()
+            if completed:
+                for tmp, path in pending:
+                    if os.path.exists(tmp):
+                        os.replace(tmp, path)
+        finally:
+            for tmp, _path in pending:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+        return completed
+
+
+def play_audio_file(path, interrupt: threading.Event) -> bool:
+    """Reproduce ``path`` hasta terminar o hasta que ``interrupt`` se active.
+
+    Retorna True si se reprodujo completo.
+    """
+    if sys.platform == "win32":
+        import winsound
+        with wave.open(path, "rb") as w:
+            duration = w.getnframes() / w.getframerate()
+        winsound.PlaySound(path, winsound.SND_FILENAME | winsound.SND_ASYNC)
+        if interrupt.wait(duration):
+            winsound.PlaySound(None, 0)
+            return False
+        return True
+
+    player = ["afplay", path] if sys.platform == "darwin" else ["aplay", "-q", path]
+    proc = subprocess.Popen(player, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    while proc.poll() is None:
+        if interrupt.wait(0.05):
+            proc.terminate()
+            proc.wait()
+            return False
+    return proc.returncode == 0
+
+
+_prerender_engine = None
+
+
+def _prerender_init(rate, volume):
+    global _prerender_engine
+    import pyttsx3
+    _init_com()
+    _prerender_engine = pyttsx3.init()
+    _configure_engine(_prerender_engine, rate, volume)
+
+
+def _prerender_chunk(texts, directory, rate):
+    engine = _prerender_engine
+    cache = NarrationCache(directory)
+    voice = engine.getProperty('voice')
+    todo = [t for t in texts if cache.lookup(t, voice, rate) is None]
+    if todo:
+        cache.render(engine, todo, voice, rate)
+    return len(texts)
+
+
+def prerender_narrations(texts, directory=TTS_CACHE_DIR, rate=TTS_RATE, volume=TTS_VOLUME,
+                         workers=None, chunk_size=16):
+    """Sintetiza en paralelo (un proceso y un motor por núcleo) las narraciones que falten"""
+    texts = list(dict.fromkeys(texts))
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    if not chunks:
+        return 0
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                             initializer=_prerender_init, initargs=(rate, volume)) as pool:
+        return sum(pool.map(_prerender_chunk, chunks,
+                            [directory] * len(chunks), [rate] * len(chunks)))
+
+
 class TTSEngine:
-    """Motor de síntesis de voz"""
-    
-    def __init__(self):
+    """Motor de síntesis de voz con un único hilo de trabajo persistente.
+
+    El hilo de voz crea y usa el motor de pyttsx3; nadie más lo toca. La
+    interfaz le envía órdenes por una cola (decir, detener, saltar, cambiar
+    velocidad, cancelar una locución en cola). El avance (inicio, palabras,
+    fin) se deja en ``events`` y se avisa al hilo de Tk con el evento virtual
+    ``<<TTSEvent>>``, sin sondeo.
+
+    El motor se crea de forma diferida en el hilo de voz (``start()`` o la
+    primera lectura), así que crear un TTSEngine no retrasa la ventana.
+
+    Cada texto se narra por frases: la primera empieza a sonar sin esperar al
+    resto, y entre frases se puede saltar a la siguiente, a la anterior o a
+    una frase cualquiera (``seek``).
+
+    Con ``use_cache`` cada texto se sintetiza una sola vez a un archivo de
+    audio (ver ``NarrationCache``) y las lecturas siguientes lo reproducen.
+    """
+
+    EVENT = "<<TTSEvent>>"
+
+    def __init__(self, widget=None, rate=TTS_RATE, volume=TTS_VOLUME, cache=None):
+        self.widget = widget
         self.engine = None
-        self.is_speaking = False
-        self.current_thread = None
-        
-        if TTS_AVAILABLE:
-            try:
-                self.engine = pyttsx3.init()
-                # Configuración de voz
-                self.engine.setProperty('rate', 150)     # Velocidad (palabras por minuto)
-                self.engine.setProperty('volume', 0.9)   # Volumen (0.0 a 1.0)
-                
-                # Intentar establecer voz en español si está disponible
-                voices = self.engine.getProperty('voices')
-                for voice in voices:
-                    if 'spanish' in voice.name.lower() or 'spanish' in voice.languages[0].lower():
-                        self.engine.setProperty('voice', voice.id)
-                        break
-            except Exception as e:
-                print(f"Error inicializando TTS: {e}")
-                self.engine = None
-    
-    def speak(self, text, callback=None):
-        """Habla el texto en un thread separado"""
-        if not self.engine:
+        self.rate = rate
+        self.volume = volume
+        self.cache = cache or NarrationCache()
+        self.use_cache = False
+        self._engine_rate = rate
+        self.events = queue.Queue()
+        self._commands = queue.Queue()
+        self._ids = itertools.count(1)
+        self._epoch = 0
+        self._cancelled = set()
+        self._current = None
+        self._sentence = 0
+        self._sentence_count = 0
+        self._seek_to = None
+        self._offset = 0
+        self._requested = None   # Momento del último speak() (para medir la latencia)
+        self._text_len = 0
+        self._interrupt = threading.Event()
+        self._rendering = False   # Sintetizando a archivo: las palabras no son las que suenan
+        self._thread = None
+        self.failed = not TTS_AVAILABLE
+
+    # --- Órdenes (desde el hilo de Tk) ---
+    def start(self):
+        """Arranca el hilo de voz (que crea el motor) si aún no existe"""
+        if self._thread is None and not self.failed:
+            self._thread = threading.Thread(target=self._run, daemon=True, name="tts")
+            self._thread.start()
+
+    def speak(self, text, start=0):
+        """Encola ``text`` (desde la frase ``start``) y retorna el id de la locución.
+
+        Retorna None si no hay voz.
+        """
+        if self.failed:
+            return None
+        self.start()
+        utt_id = next(self._ids)
+        self._commands.put(("say", utt_id, self._epoch, split_sentences(text), start,
+                            time.perf_counter()))
+        return utt_id
+
+    def seek(self, sentence):
+        """Salta a la frase ``sentence`` de la locución actual"""
+        if self._current is not None:
+            self._seek_to = max(0, min(sentence, self._sentence_count - 1))
+            self._interrupt.set()
+
+    def next_sentence(self):
+        self.seek(self._sentence + 1)
+
+    def prev_sentence(self):
+        self.seek(self._sentence - 1)
+
+    @property
+    def sentence(self):
+        """Frase que se está leyendo (o la última leída)"""
+        return self._sentence
+
+    def cancel(self, utt_id):
+        """Cancela una locución, esté en cola o sonando"""
+        self._cancelled.add(utt_id)
+        if self._current == utt_id:
+            self._interrupt.set()
+
+    def skip(self):
+        """Corta la locución actual y pasa a la siguiente en cola"""
+        if self._current is not None:
+            self._interrupt.set()
+
+    def stop(self):
+        """Corta la locución actual y descarta las que estaban en cola"""
+        self._epoch += 1
+        self.skip()
+
+    def set_rate(self, rate):
+        """Cambia la velocidad (palabras por minuto) desde la próxima locución"""
+        self.rate = rate
+        self._commands.put(("rate", rate))
+
+    def is_available(self):
+        """Retorna si TTS está disponible (o todavía no se sabe que falló)"""
+        return not self.failed
+
+    # --- Hilo de voz ---
+    def _run(self):
+        try:
+            with TRACER.span("tts.init"):
+                import pyttsx3
+                _init_com()
+                engine = pyttsx3.init()
+                _configure_engine(engine, self.rate, self.volume)
+                engine.connect('started-word', self._on_word)
+            self.engine = engine
+        except Exception as e:
+            print(f"Error inicializando TTS: {e}")
+            self.failed = True
+            self._post("unavailable", None)
+
+        while self.engine is not None:
+            command = self._commands.get()
+            if command[0] == "rate":
+                self.engine.setProperty('rate', command[1])
+                self._engine_rate = command[1]
+                continue
+            _say, utt_id, epoch, sentences, start, requested = command
+            self._requested = requested
+            self._say(utt_id, epoch, sentences, start)
+
+    def _say(self, utt_id, epoch, sentences, start):
+        self._current = utt_id
+        self._sentence = max(0, min(start, len(sentences) - 1))
+        self._sentence_count = len(sentences)
+        self._seek_to = None
+        offsets = list(itertools.accumulate(len(x) + 1 for x in sentences))
+        self._text_len = max(1, offsets[-1] if offsets else 0)
+        self._interrupt.clear()
+        if epoch != self._epoch or utt_id in self._cancelled:
+            self._current = None
+            self._cancelled.discard(utt_id)
+            self._post("cancelled", utt_id)
             return
-        
-        # Detener cualquier speech anterior
-        self.stop()
-        
-        def _speak():
+
+        result = "done"
+        self._post("start", utt_id)
+
+        while self._sentence < len(sentences):
+            self._interrupt.clear()
+            # Revisar después de limpiar la bandera: stop()/cancel() pudieron llegar antes
+            if epoch != self._epoch or utt_id in self._cancelled:
+                result = "interrupted"
+                break
+            if self._seek_to is not None:
+                self._sentence, self._seek_to = self._seek_to, None
+
+            i = self._sentence
+            self._offset = offsets[i - 1] if i else 0
+            self._post("sentence", utt_id, (i, len(sentences)))
             try:
-                self.is_speaking = True
-                self.engine.say(text)
-                self.engine.runAndWait()
-                self.is_speaking = False
-                if callback:
-                    callback()
+                if not (self.use_cache and self._play_cached(sentences[i])):
+                    self.engine.say(sentences[i])
+                    self.engine.runAndWait()
             except Exception as e:
                 print(f"Error en TTS: {e}")
-                self.is_speaking = False
-        
-        self.current_thread = threading.Thread(target=_speak, daemon=True)
-        self.current_thread.start()
-    
+                self._post("error", utt_id, str(e))
+                result = None
+                break
+
+            if self._seek_to is not None:
+                continue
+            if self._interrupt.is_set():
+                result = "interrupted"
+                break
+            self._sentence += 1
+
+        self._current = None
+        self._sentence = min(self._sentence, max(0, len(sentences) - 1))
+        self._cancelled.discard(utt_id)
+        if result:
+            self._post(result, utt_id)
+
+    def _play_cached(self, text):
+        """Reproduce ``text`` desde la caché (sintetizándolo si falta); False si no se pudo"""
+        voice = self.engine.getProperty('voice')
+        try:
+            path = self.cache.lookup(text, voice, self._engine_rate)
+            if path is None:
+                self._rendering = True
+                try:
+                    self.cache.render(self.engine, [text], voice, self._engine_rate, self._interrupt)
+                finally:
+                    self._rendering = False
+                path = self.cache.lookup(text, voice, self._engine_rate)
+            if self._interrupt.is_set():
+                return True   # Detenida mientras se sintetizaba: nada que reproducir
+            if path is None:
+                return False
+            self._audio_started()
+            play_audio_file(path, self._interrupt)
+            return True
+        except Exception as e:
+            print(f"Audio en caché no disponible: {e}")
+            return False
+
+    def _audio_started(self):
+        """Registra la latencia desde ``speak`` hasta que empieza a sonar"""
+        if self._requested is not None:
+            TRACER.record("tts.start", self._requested)
+            self._requested = None
+
+    def _on_word(self, _name, location, length):
+        if self._rendering:
+            # engine.stop() cortaría el archivo a medio escribir
+            return
+        if self._interrupt.is_set():
+            self.engine.stop()
+            return
+        self._audio_started()
+        done = self._offset + location + length
+        self._post("word", self._current, min(100, 100 * done // self._text_len))
+
+    def _post(self, kind, utt_id, data=None):
+        self.events.put((kind, utt_id, data))
+        if self.widget is not None:
+            try:
+                self.widget.event_generate(self.EVENT, when="tail")
+            except (RuntimeError, tk.TclError):
+                # La ventana ya se cerró
+                pass
+
+
+# ---------------------------
+# Lista virtualizada
+# ---------------------------
+class VirtualList(tk.Frame):
+    """Lista que sólo dibuja las filas visibles.
+
+    En lugar de insertar todos los elementos en el Listbox, guarda cuántos hay
+    y una función ``formatter(pos)`` que da el texto de la posición ``pos``.
+    Al cambiar el filtro, desplazarse o mover la selección sólo se reescriben
+    las filas visibles, así que el costo no depende del tamaño de la lista.
+    """
+
+    def __init__(self, master, on_select=None, bg=None, **listbox_options):
+        super().__init__(master, bg=bg)
+        self.on_select = on_select
+        self.count = 0
+        self.formatter = None
+        self.top = 0
+        self.rows = listbox_options.get("height", 20)
+        self.selected = None
+
+        self.scrollbar = tk.Scrollbar(self, command=self.yview)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.listbox = tk.Listbox(self, bg=bg, exportselection=False, **listbox_options)
+        self.listbox.pack(side="left", fill="both", expand=True)
+        # Alto de fila y borde tal como los calcula Tk para un Listbox
+        lb = self.listbox
+        self.line_height = (tkfont.Font(font=lb.cget("font")).metrics("linespace")
+                            + 1 + 2 * int(lb.cget("selectborderwidth")))
+        self.inset = int(lb.cget("borderwidth")) + int(lb.cget("highlightthickness"))
+
+        self.listbox.bind("<<ListboxSelect>>", self._on_click)
+        self.listbox.bind("<Configure>", self._on_resize)
+        self.listbox.bind("<MouseWheel>", self._on_wheel)
+        self.listbox.bind("<Button-4>", lambda e: self._scroll_units(-3))
+        self.listbox.bind("<Button-5>", lambda e: self._scroll_units(3))
+        self.listbox.bind("<Up>", lambda e: self._move_selection(-1))
+        self.listbox.bind("<Down>", lambda e: self._move_selection(1))
+        self.listbox.bind("<Prior>", lambda e: self._move_selection(-self.rows))
+        self.listbox.bind("<Next>", lambda e: self._move_selection(self.rows))
+        self.listbox.bind("<Home>", lambda e: self._move_selection(-self.count))
+        self.listbox.bind("<End>", lambda e: self._move_selection(self.count))
+
+    def set_items(self, count: int, formatter):
+        """Reemplaza el contenido: ``count`` elementos, texto dado por ``formatter(pos)``"""
+        self.count = count
+        self.formatter = formatter
+        self.top = 0
+        self.selected = None
+        self._render()
+
+    def select(self, pos: int):
+        """Selecciona la posición ``pos`` y la hace visible"""
+        if not self.count:
+            return
+        self.selected = max(0, min(pos, self.count - 1))
+        if self.selected < self.top:
+            self._scroll_to(self.selected)
+        elif self.selected >= self.top + self.rows:
+            self._scroll_to(self.selected - self.rows + 1)
+        else:
+            self.listbox.selection_clear(0, "end")
+            self.listbox.selection_set(self.selected - self.top)
+
+    def yview(self, *args):
+        """Comando del scrollbar ("moveto" o "scroll")"""
+        if args[0] == "moveto":
+            self._scroll_to(int(float(args[1]) * self.count))
+        elif args[0] == "scroll":
+            step = self.rows if args[2] == "pages" else 1
+            self._scroll_to(self.top + int(args[1]) * step)
+
+    def _scroll_to(self, top: int):
+        self.top = max(0, min(top, self.count - self.rows))
+        self._render()
+
+    def _scroll_units(self, units: int):
+        self._scroll_to(self.top + units)
+        return "break"
+
+    def _render(self):
+        lb = self.listbox
+        end = min(self.count, self.top + self.rows)
+        lb.delete(0, "end")
+        if end > self.top:
+            lb.insert(0, *[self.formatter(pos) for pos in range(self.top, end)])
+        if self.selected is not None and self.top <= self.selected < end:
+            lb.selection_set(self.selected - self.top)
+        if self.count:
+            self.scrollbar.set(self.top / self.count, end / self.count)
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _on_resize(self, event):
+        rows = max(1, (event.height - 2 * self.inset) // self.line_height)
+        if rows != self.rows:
+            self.rows = rows
+            self._scroll_to(self.top)
+
+    def _on_wheel(self, event):
+        return self._scroll_units(-3 if event.delta > 0 else 3)
+
+    def _on_click(self, *_):
+        sel = self.listbox.curselection()
+        if not sel:
+            return
+        self.selected = self.top + sel[0]
+        if self.on_select:
+            self.on_select(self.selected)
+
+    def _move_selection(self, delta: int):
+        if self.count:
+            current = self.top if self.selected is None else self.selected
+            self.select(current + delta)
+            if self.on_select:
+                self.on_select(self.selected)
+        return "break"
+
+
+# ---------------------------
+# Carga de imágenes en segundo plano
+# ---------------------------
+THUMB_SIZE = (900, 400)                # Tamaño máximo de las miniaturas
+THUMB_CACHE_BYTES = 64 * 1024 * 1024   # Memoria máxima de la caché de miniaturas
+THUMB_CACHE_DIR = ".thumbcache"        # Miniaturas guardadas entre ejecuciones
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".bmp", ".webp")
+
+
+class ThumbnailDiskCache:
+    """Caché de miniaturas en disco, válida entre ejecuciones.
+
+    El nombre de cada archivo es un hash de la ruta del original, su mtime,
+    su tamaño en bytes y el tamaño de la miniatura: si el original cambia, su
+    entrada vieja deja de usarse y se genera una nueva.
+    """
+
+    def __init__(self, directory=THUMB_CACHE_DIR, size=THUMB_SIZE):
+        self.directory = directory
+        self.size = tuple(size)
+
+    def path_for(self, src: str):
+        try:
+            st = os.stat(src)
+        except OSError:
+            return None
+        key = f"{os.path.abspath(src)}|{st.st_mtime_ns}|{st.st_size}|{self.size[0]}x{self.size[1]}"
+        return os.path.join(self.directory, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".png")
+
+    def load(self, src: str):
+        """Miniatura guardada de ``src``, o None si no existe o está desactualizada"""
+        path = self.path_for(src)
+        if path is None or not os.path.exists(path):
+            return None
+        try:
+            with Image.open(path) as im:
+                im.load()
+                return im
+        except Exception:
+            return None
+
+    def build(self, src: str):
+        """Reduce el original de ``src``, guarda la miniatura y la retorna"""
+        path = self.path_for(src)
+        with Image.open(src) as im:
+            im.thumbnail(self.size)
+            im.load()
+            thumb = im
+        if path is not None:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            try:
+                thumb.save(tmp, format="PNG", compress_level=1)
+                os.replace(tmp, path)
+            except OSError as e:
+                print(f"No se pudo guardar la miniatura de {src}: {e}")
+        return thumb
+
+    def get(self, src: str):
+        thumb = self.load(src)
+        return thumb if thumb is not None else self.build(src)
+
+    def prune(self, keep):
+        """Borra las miniaturas que no estén en ``keep`` (rutas de caché vigentes)"""
+        keep = {os.path.basename(p) for p in keep if p}
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        for name in names:
+            if name.endswith(".png") and name not in keep:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+
+def _warm_thumbnail(src, directory, size):
+    cache = ThumbnailDiskCache(directory, size)
+    try:
+        if cache.load(src) is None:
+            cache.build(src)
+        return True
+    except Exception as e:
+        print(f"Error generando miniatura de {src}: {e}")
+        return False
+
+
+def warm_thumbnail_cache(asset_dir="assets", directory=THUMB_CACHE_DIR, size=THUMB_SIZE, workers=None):
+    """Genera en paralelo (un proceso por núcleo) las miniaturas de ``asset_dir``.
+
+    Retorna el número de miniaturas listas; borra las entradas obsoletas.
+    """
+    try:
+        names = sorted(os.listdir(asset_dir))
+    except OSError:
+        return 0
+    sources = [os.path.join(asset_dir, n) for n in names if n.lower().endswith(IMAGE_EXTENSIONS)]
+    if not sources:
+        return 0
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        done = sum(pool.map(_warm_thumbnail, sources,
+                            [directory] * len(sources), [size] * len(sources)))
+    cache = ThumbnailDiskCache(directory, size)
+    cache.prune(cache.path_for(src) for src in sources)
+    return done
+
+
+class ThumbnailLoader:
+    """Decodifica y reduce imágenes en un pool de hilos, con caché LRU.
+
+    Las miniaturas listas se guardan con clave (archivo, mtime, tamaño), de
+    modo que un archivo modificado se vuelve a cargar. La caché está limitada
+    en bytes y descarta primero las menos usadas. ``request`` retorna la
+    miniatura si ya está en caché; si no, la pide al pool y la entrega después
+    por callback en el hilo de Tk. Con ``disk_cache`` se lee primero la
+    miniatura guardada en disco y sólo se decodifica el original si falta.
+    """
+
+    def __init__(self, widget: tk.Misc, size=THUMB_SIZE, max_bytes=THUMB_CACHE_BYTES, workers=2,
+                 disk_cache=None):
+        self.widget = widget
+        self.size = size
+        self.disk_cache = disk_cache
+        self.max_bytes = max_bytes
+        self.cache = OrderedDict()
+        self.cache_bytes = 0
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="thumbs")
+
+    def key(self, path: str):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (os.path.abspath(path), st.st_mtime_ns, self.size)
+
+    def request(self, path: str, callback=None):
+        """Miniatura de ``path`` si está en caché; si no, la carga y llama ``callback(imagen)``"""
+        key = self.key(path)
+        if key is None:
+            return None
+        with self._lock:
+            thumb = self.cache.get(key)
+            if thumb is not None:
+                self.cache.move_to_end(key)
+                return thumb
+            future = self._pending.get(key)
+            if future is None:
+                future = self._pending[key] = self._pool.submit(self._load, key)
+        if callback:
+            future.add_done_callback(lambda f: self._deliver(f, callback))
+        return None
+
+    def discard(self, path: str):
+        """Olvida las miniaturas en memoria de ``path`` (p. ej. si el hito cambió de imagen)"""
+        path = os.path.abspath(path)
+        with self._lock:
+            for key in [key for key in self.cache if key[0] == path]:
+                self.cache_bytes -= self._nbytes(self.cache.pop(key))
+
+    def prefetch(self, paths):
+        """Carga en segundo plano las miniaturas que probablemente se verán después"""
+        for path in paths:
+            self.request(path)
+
+    def _load(self, key):
+        thumb = None
+        start = time.perf_counter()
+        try:
+            if self.disk_cache is not None:
+                thumb = self.disk_cache.get(key[0])
+            else:
+                with Image.open(key[0]) as im:
+                    im.thumbnail(self.size)
+                    im.load()
+                    thumb = im
+        except Exception as e:
+            print(f"Error cargando imagen {key[0]}: {e}")
+        TRACER.record("thumbnail.decode", start)
+        with self._lock:
+            self._pending.pop(key, None)
+            if thumb is not None:
+                self._store(key, thumb)
+        return thumb
+
+    def _store(self, key, thumb):
+        self.cache[key] = thumb
+        self.cache_bytes += self._nbytes(thumb)
+        while self.cache_bytes > self.max_bytes and len(self.cache) > 1:
+            _key, old = self.cache.popitem(last=False)
+            self.cache_bytes -= self._nbytes(old)
+
+    @staticmethod
+    def _nbytes(im):
+        return im.width * im.height * len(im.getbands())
+
+    def _deliver(self, future, callback):
+        try:
+            self.widget.after(0, callback, future.result())
+        except RuntimeError:
+            # La ventana ya se cerró
+            pass
+
+
+# ---------------------------
+# Recarga del catálogo y exportación en segundo plano
+# ---------------------------
+CATALOG_POLL_MS = 1000   # Cada cuánto se revisa si el catálogo cambió
+
+
+class CatalogWatcher:
+    """Recarga el catálogo cuando su archivo cambia, sin reconstruir todo.
+
+    Cada ``interval_ms`` se revisa la fecha y tamaño del archivo (y del
+    cuestionario) en el hilo de Tk. Si cambiaron, el archivo se lee y se
+    compara con el catálogo actual en un hilo aparte; ``on_change(diff,
+    cuestionario)`` recibe el resultado en el hilo de Tk, donde se aplica con
+    ``Catalog.apply``. Si el archivo no se puede leer (p. ej. se está
+    guardando) se reintenta en la siguiente revisión.
+    """
+
+    def __init__(self, widget: tk.Misc, catalog: Catalog, on_change, interval_ms=CATALOG_POLL_MS):
+        self.widget = widget
+        self.catalog = catalog
+        self.on_change = on_change
+        self.interval_ms = interval_ms
+        self._stamp = None
+        self._busy = False
+        self._after_id = None
+
+    def start(self):
+        self._stamp = self._stat()
+        self._schedule()
+
     def stop(self):
-        """Detiene el speech actual"""
-        if self.engine and self.is_speaking:
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _schedule(self):
+        self._after_id = self.widget.after(self.interval_ms, self._poll)
+
+    def _stat(self):
+        stamp = []
+        for path in (self.catalog.source, self.catalog.quiz_path):
+            if path:
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    return None
+                stamp.append((st.st_mtime_ns, st.st_size))
+        return stamp
+
+    def _poll(self):
+        stamp = self._stat()
+        if stamp is not None and stamp != self._stamp and not self._busy:
+            self._stamp = stamp
+            self._busy = True
+            threading.Thread(target=self._reload, daemon=True, name="catalog-reload").start()
+        self._schedule()
+
+    def _reload(self):
+        try:
+            table, quiz = Catalog.read(self.catalog.source, self.catalog.quiz_path)
+            diff = self.catalog.diff(table)
+        except Exception as e:
+            print(f"No se pudo recargar el catálogo: {e}")
+            diff = quiz = None
+        try:
+            self.widget.after(0, self._deliver, diff, quiz)
+        except RuntimeError:
+            # La ventana ya se cerró
+            pass
+
+    def _deliver(self, diff, quiz):
+        self._busy = False
+        if diff is None:
+            self._stamp = None   # Reintentar en la siguiente revisión
+            return
+        self.on_change(diff, quiz)
+
+
+class ExportJob:
+    """Exporta en un hilo aparte, con avance y cancelación.
+
+    Se escribe a un archivo temporal que se renombra al terminar, así que
+    cancelar (o un error) no deja un archivo a medias. Si la ruta termina en
+    .gz o .xz el archivo se comprime al escribirlo. ``on_progress(hechas,
+    total)`` y ``on_done(resultado, error)`` se llaman en el hilo de Tk;
+    ``resultado`` es "done", "cancelled" o "error".
+    """
+
+    def __init__(self, widget: tk.Misc, writer, path, table, ids, on_progress=None, on_done=None):
+        self.widget = widget
+        self.writer = writer
+        self.path = path
+        self.table = table
+        self.ids = ids
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.cancelled = threading.Event()
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True, name="export").start()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def _run(self):
+        tmp = f"{self.path}.part"
+        result, error = "done", None
+        try:
+            ext, compression = split_export_path(self.path)
+            binary = EXPORT_FORMATS.get(ext, (None, False))[1]
+            with TRACER.span(f"export{ext}{compression or ''}"), \
+                    open_export(tmp, "w", compression, binary) as f:
+                completed = self.writer(f, self.table, self.ids, self._chunk_done)
+            if completed:
+                os.replace(tmp, self.path)
+            else:
+                result = "cancelled"
+        except Exception as e:
+            result, error = "error", e
+        if result != "done":
             try:
-                self.engine.stop()
-                self.is_speaking = False
-            except:
+                os.remove(tmp)
+            except OSError:
                 pass
-    
-    def is_available(self):
-        """Retorna si TTS está disponible"""
-        return self.engine is not None
+        self._post(self.on_done, result, error)
+
+    def _chunk_done(self, done):
+        self._post(self.on_progress, done, len(self.ids))
+        return not self.cancelled.is_set()
+
+    def _post(self, callback, *args):
+        if callback is None:
+            return
+        try:
+            self.widget.after(0, callback, *args)
+        except RuntimeError:
+            # La ventana ya se cerró
+            pass
+
+
+class ExportDialog(tk.Toplevel):
+    """Ventana de avance de una exportación, con botón para cancelar"""
+
+    def __init__(self, master, title, total, on_cancel):
+        super().__init__(master)
+        self.title(title)
+        self.resizable(False, False)
+        self.configure(bg=COLORS['bg_card'], padx=20, pady=15)
+        self.transient(master)
+        self.total = max(1, total)
+
+        self.label = tk.Label(self,
+                              text=f"Exportando 0 de {total:,} hitos...",
+                              font=("Segoe UI", 11),
+                              fg=COLORS['text_primary'],
+                              bg=COLORS['bg_card'])
+        self.label.pack(anchor="w", pady=(0, 10))
+
+        self.progress = ttk.Progressbar(self, length=360, maximum=self.total)
+        self.progress.pack(fill="x", pady=(0, 15))
+
+        cancel_btn = tk.Button(self,
+                               text="✖️ Cancelar",
+                               font=("Segoe UI", 10),
+                               bg=COLORS['danger'],
+                               fg=COLORS['bg_card'],
+                               activebackground=COLORS['warning'],
+                               relief="flat",
+                               padx=15,
+                               pady=6,
+                               cursor="hand2",
+                               command=on_cancel)
+        cancel_btn.pack(side="right")
+        self.protocol("WM_DELETE_WINDOW", on_cancel)
+
+    def set_progress(self, done, total):
+        self.progress.configure(value=done)
+        self.label.configure(text=f"Exportando {done:,} de {total:,} hitos...")
+
+
+PERF_REFRESH_MS = 500   # Cada cuánto se actualiza el panel de rendimiento
+
+
+class PerfOverlay(tk.Frame):
+    """Panel flotante con los percentiles de cada span de ``TRACER``"""
+
+    def __init__(self, master):
+        super().__init__(master, bg=COLORS['text_primary'], padx=10, pady=8)
+        self._after_id = None
+        self.text = tk.Label(self,
+                             font=("Consolas", 9),
+                             fg=COLORS['bg_card'],
+                             bg=COLORS['text_primary'],
+                             justify="left",
+                             anchor="w")
+        self.text.pack(fill="both")
+
+        buttons = tk.Frame(self, bg=COLORS['text_primary'])
+        buttons.pack(fill="x", pady=(6, 0))
+        for text, command in (("💾 Guardar traza", self.save_trace), ("🗑️ Limpiar", TRACER.clear)):
+            tk.Button(buttons,
+                      text=text,
+                      font=("Segoe UI", 9),
+                      bg=COLORS['primary'],
+                      fg=COLORS['bg_card'],
+                      activebackground=COLORS['primary_dark'],
+                      relief="flat",
+                      padx=8,
+                      cursor="hand2",
+                      command=command).pack(side="left", padx=(0, 6))
+
+    def show(self):
+        self.place(relx=1.0, rely=0.0, x=-20, y=20, anchor="ne")
+        self.lift()
+        self.refresh()
+
+    def hide(self):
+        if self._after_id is not None:
+            self.after_cancel(self._after_id)
+            self._after_id = None
+        self.place_forget()
+
+    def refresh(self):
+        lines = [f"{'span':<18}{'n':>6}{'p50':>9}{'p90':>9}{'p99':>9}{'máx':>9}"]
+        for name, st in TRACER.summary().items():
+            lines.append(f"{name:<18}{st['n']:>6}{st['p50']:>9.2f}{st['p90']:>9.2f}"
+                         f"{st['p99']:>9.2f}{st['max']:>9.2f}")
+        if len(lines) == 1:
+            lines.append("(sin datos todavía)")
+        self.text.config(text="\n".join(lines) + "\n(tiempos en ms)")
+        self._after_id = self.after(PERF_REFRESH_MS, self.refresh)
+
+    def save_trace(self):
+        path = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            filetypes=[("Traza JSON", "*.json")],
+            title="Guardar traza de rendimiento"
+        )
+        if path:
+            count = TRACER.dump(path)
+            messagebox.showinfo("Traza de rendimiento", f"✅ {count} spans guardados en:\n{path}")
 
 
 class TimelineApp(tk.Tk):
-    def __init__(self):
+    def __init__(self, catalog=None, quiz_seed=None, generated_quiz=True):
         super().__init__()
         self.title("📚 Historia y evolución de la graficación por computadora")
         self.geometry("1200x750")
@@ -244,12 +1126,49 @@ class TimelineApp(tk.Tk):
         self.configure(bg=COLORS['bg_main'])
 
         # Motor TTS
-        self.tts = TTSEngine()
+        self.tts = TTSEngine(self)
+        self.tts.use_cache = os.path.isdir(TTS_CACHE_DIR)
+        self.after(TTS_START_DELAY_MS, self.tts.start)
+        self._utterance = None
+        self._speaking_item = None
+        self._sentences = []
+        self._sentence_pos = 0
+        self._resume = None   # (hito, frase) donde se detuvo la lectura
+        self.bind(TTSEngine.EVENT, self.on_tts_event)
+
+        # Catálogo e índice de búsqueda (se construyen una sola vez)
+        self.catalog = catalog if catalog is not None else Catalog.builtin()
+        self.table = self.catalog.table
+        self.index = self.catalog.index
+        self.searcher = IncrementalSearch(self.index)
+        self.facets = self.catalog.facets
+
+        # Cuestionario generado: el siguiente se prepara en segundo plano para
+        # que abrir QuizWindow no tenga que esperar
+        self.generated_quiz = generated_quiz
+        self.quiz_seed = quiz_seed if quiz_seed is not None else random.randrange(1 << 31)
+        self._next_quiz = None   # (semilla, preguntas) ya generadas
+        if generated_quiz:
+            self.after_idle(self.prepare_quiz)
+
+        # Miniaturas (se decodifican en segundo plano)
+        self.thumbs = (ThumbnailLoader(self, disk_cache=ThumbnailDiskCache())
+                       if PIL_AVAILABLE else None)
+        self._image_path = None
+        self.search_pipeline = SearchPipeline(self, self.filter_ids)
+        self._last_query = ""
+
+        # Recarga en caliente si el catálogo viene de un archivo
+        self.watcher = None
+        if self.catalog.source:
+            self.watcher = CatalogWatcher(self, self.catalog, self.on_catalog_change)
+            self.watcher.start()
 
         # Estado
-        self.filtered = list(MILESTONES)
+        self.filtered = self.table.all_ids()   # Índices de la tabla
         self.current_index = 0
         self.current_decade = None
+        self.current_tag = None
 
         # Estilos visuales modernos
         self.style = ttk.Style(self)
@@ -266,6 +1185,10 @@ class TimelineApp(tk.Tk):
         self.refresh_list()
         self.show_item(0)
 
+        # Panel de rendimiento (F12)
+        self.perf_overlay = None
+        self.bind("<F12>", self.toggle_perf_overlay)
+
     def configure_styles(self):
         """Configura estilos visuales modernos"""
         # Labels
@@ -325,7 +1248,7 @@ class TimelineApp(tk.Tk):
         # Panel izquierdo (sidebar)
         left = ttk.Frame(self, padding=15, style="Sidebar.TFrame")
         left.grid(row=0, column=0, sticky="nsw")
-        left.grid_rowconfigure(7, weight=1)
+        left.grid_rowconfigure(8, weight=1)
 
         # Panel derecho (contenido principal)
         right = ttk.Frame(self, padding=15, style="Card.TFrame")
@@ -351,10 +1274,13 @@ class TimelineApp(tk.Tk):
                                bg=COLORS['bg_main'])
         filter_label.grid(row=1, column=0, sticky="w", pady=(0, 8))
         
-        self.decade_var = tk.StringVar(value="Todas las décadas")
-        self.decade_menu = ttk.OptionMenu(left, self.decade_var, "Todas las décadas", 
-                                         command=self.on_decade_change)
-        self.decade_menu.grid(row=2, column=0, sticky="ew", pady=(0, 15))
+        self.decade_var = tk.StringVar(value=ALL_DECADES)
+        self.decade_menu = ttk.OptionMenu(left, self.decade_var, ALL_DECADES)
+        self.decade_menu.grid(row=2, column=0, sticky="ew", pady=(0, 8))
+
+        self.tag_var = tk.StringVar(value=ALL_TAGS)
+        self.tag_menu = ttk.OptionMenu(left, self.tag_var, ALL_TAGS)
+        self.tag_menu.grid(row=3, column=0, sticky="ew", pady=(0, 15))
 
         # Sección Búsqueda
         search_label = tk.Label(left,
@@ -362,15 +1288,15 @@ class TimelineApp(tk.Tk):
                                font=("Segoe UI", 12, "bold"),
                                fg=COLORS['text_primary'],
                                bg=COLORS['bg_main'])
-        search_label.grid(row=3, column=0, sticky="w", pady=(0, 8))
+        search_label.grid(row=4, column=0, sticky="w", pady=(0, 8))
         
         self.search_var = tk.StringVar()
         self.search_entry = ttk.Entry(left, textvariable=self.search_var, font=("Segoe UI", 11))
-        self.search_entry.grid(row=4, column=0, sticky="ew", pady=(0, 10))
+        self.search_entry.grid(row=5, column=0, sticky="ew", pady=(0, 10))
         self.search_entry.bind("<KeyRelease>", self.on_search)
 
         clear_btn = ttk.Button(left, text="🔄 Limpiar filtros", command=self.clear_filters)
-        clear_btn.grid(row=5, column=0, sticky="ew", pady=(0, 20))
+        clear_btn.grid(row=6, column=0, sticky="ew", pady=(0, 20))
 
         # Lista de eventos
         list_label = tk.Label(left,
@@ -378,31 +1304,22 @@ class TimelineApp(tk.Tk):
                              font=("Segoe UI", 12, "bold"),
                              fg=COLORS['text_primary'],
                              bg=COLORS['bg_main'])
-        list_label.grid(row=6, column=0, sticky="w", pady=(0, 8))
-        
-        # Frame para listbox con scrollbar
-        list_frame = tk.Frame(left, bg=COLORS['bg_main'])
-        list_frame.grid(row=7, column=0, sticky="nsew")
-        
-        scrollbar = tk.Scrollbar(list_frame)
-        scrollbar.pack(side="right", fill="y")
-        
-        self.listbox = tk.Listbox(list_frame, 
-                                  activestyle="none",
-                                  height=20, 
-                                  font=("Segoe UI", 11),
-                                  bg=COLORS['bg_card'],
-                                  fg=COLORS['text_primary'],
-                                  selectbackground=COLORS['primary_light'],
-                                  selectforeground=COLORS['bg_card'],
-                                  borderwidth=1,
-                                  relief="solid",
-                                  highlightthickness=0,
-                                  yscrollcommand=scrollbar.set)
-        self.listbox.pack(side="left", fill="both", expand=True)
-        scrollbar.config(command=self.listbox.yview)
+        list_label.grid(row=7, column=0, sticky="w", pady=(0, 8))
         
-        self.listbox.bind("<<ListboxSelect>>", self.on_list_select)
+        # Lista virtualizada (sólo dibuja las filas visibles)
+        self.event_list = VirtualList(left,
+                                      on_select=self.on_list_select,
+                                      bg=COLORS['bg_card'],
+                                      activestyle="none",
+                                      height=20,
+                                      font=("Segoe UI", 11),
+                                      fg=COLORS['text_primary'],
+                                      selectbackground=COLORS['primary_light'],
+                                      selectforeground=COLORS['bg_card'],
+                                      borderwidth=1,
+                                      relief="solid",
+                                      highlightthickness=0)
+        self.event_list.grid(row=8, column=0, sticky="nsew")
 
         # --- PANEL DERECHO (Detalle del contenido) ---
         
@@ -451,6 +1368,7 @@ class TimelineApp(tk.Tk):
         self.body_text.pack(side="left", fill="both", expand=True)
         text_scrollbar.config(command=self.body_text.yview)
         self.body_text.configure(state="disabled")
+        self.body_text.tag_configure("speaking", background=COLORS['bg_hover'])
 
         # Botones de control de voz
         tts_frame = tk.Frame(right, bg=COLORS['bg_card'])
@@ -493,6 +1411,62 @@ class TimelineApp(tk.Tk):
                                       fg=COLORS['text_secondary'],
                                       bg=COLORS['bg_card'])
             self.tts_status.grid(row=0, column=2, sticky="w", padx=10)
+
+            # Velocidad de lectura (se aplica desde la próxima lectura)
+            rate_scale = tk.Scale(tts_frame,
+                                  from_=100,
+                                  to=250,
+                                  resolution=10,
+                                  orient="horizontal",
+                                  label="Velocidad",
+                                  font=("Segoe UI", 9),
+                                  fg=COLORS['text_secondary'],
+                                  bg=COLORS['bg_card'],
+                                  highlightthickness=0,
+                                  command=self.on_rate_change)
+            rate_scale.set(self.tts.rate)
+            rate_scale.grid(row=1, column=0, columnspan=2, sticky="ew", padx=2, pady=(5, 0))
+
+            # Reproducir narraciones ya sintetizadas (caché de audio)
+            self.tts_cache_var = tk.BooleanVar(value=self.tts.use_cache)
+            cache_check = tk.Checkbutton(tts_frame,
+                                         text="💾 Usar audio pregrabado",
+                                         variable=self.tts_cache_var,
+                                         font=("Segoe UI", 9),
+                                         fg=COLORS['text_secondary'],
+                                         bg=COLORS['bg_card'],
+                                         activebackground=COLORS['bg_card'],
+                                         command=self.on_tts_cache_toggle)
+            cache_check.grid(row=1, column=2, sticky="w", padx=10, pady=(5, 0))
+
+            # Navegación por frases durante la lectura
+            prev_sentence_btn = tk.Button(tts_frame,
+                                          text="⏮️ Frase anterior",
+                                          font=("Segoe UI", 10),
+                                          bg=COLORS['primary_light'],
+                                          fg=COLORS['bg_card'],
+                                          activebackground=COLORS['primary'],
+                                          activeforeground=COLORS['bg_card'],
+                                          relief="flat",
+                                          padx=10,
+                                          pady=6,
+                                          cursor="hand2",
+                                          command=self.tts.prev_sentence)
+            prev_sentence_btn.grid(row=2, column=0, sticky="ew", padx=2, pady=(5, 0))
+
+            next_sentence_btn = tk.Button(tts_frame,
+                                          text="Frase siguiente ⏭️",
+                                          font=("Segoe UI", 10),
+                                          bg=COLORS['primary_light'],
+                                          fg=COLORS['bg_card'],
+                                          activebackground=COLORS['primary'],
+                                          activeforeground=COLORS['bg_card'],
+                                          relief="flat",
+                                          padx=10,
+                                          pady=6,
+                                          cursor="hand2",
+                                          command=self.tts.next_sentence)
+            next_sentence_btn.grid(row=2, column=1, sticky="ew", padx=2, pady=(5, 0))
         else:
             no_tts_label = tk.Label(tts_frame,
                                    text="⚠️ Síntesis de voz no disponible (instala pyttsx3)",
@@ -504,7 +1478,7 @@ class TimelineApp(tk.Tk):
         # Navegación y exportación
         nav = tk.Frame(right, bg=COLORS['bg_card'])
         nav.grid(row=5, column=0, sticky="ew", pady=(10, 0))
-        nav.grid_columnconfigure((0, 1, 2, 3), weight=1)
+        nav.grid_columnconfigure((0, 1, 2, 3, 4), weight=1)
         
         prev_btn = tk.Button(nav,
                             text="⬅️ Anterior",
@@ -562,13 +1536,27 @@ class TimelineApp(tk.Tk):
                             command=self.export_json)
         json_btn.grid(row=0, column=3, sticky="ew", padx=2)
 
+        bin_btn = tk.Button(nav,
+                            text="🗜️ Binario",
+                            font=("Segoe UI", 11),
+                            bg=COLORS['success'],
+                            fg=COLORS['bg_card'],
+                            activebackground=COLORS['info'],
+                            activeforeground=COLORS['bg_card'],
+                            relief="flat",
+                            padx=15,
+                            pady=8,
+                            cursor="hand2",
+                            command=self.export_binary)
+        bin_btn.grid(row=0, column=4, sticky="ew", padx=2)
+
         # Botón de cuestionario (parte inferior)
         bottom = tk.Frame(self, bg=COLORS['bg_main'], pady=15)
         bottom.grid(row=1, column=0, columnspan=2, sticky="ew", padx=15)
         bottom.grid_columnconfigure(0, weight=1)
         
-        quiz_btn = tk.Button(bottom,
-                            text="📝 Iniciar cuestionario (8 preguntas)",
+        self.quiz_btn = tk.Button(bottom,
+                            text=self.quiz_label(),
                             font=("Segoe UI", 12, "bold"),
                             bg=COLORS['accent'],
                             fg=COLORS['bg_card'],
@@ -579,66 +1567,137 @@ class TimelineApp(tk.Tk):
                             pady=12,
                             cursor="hand2",
                             command=self.start_quiz)
-        quiz_btn.pack(side="right")
+        self.quiz_btn.pack(side="right")
 
     def populate_decades(self):
-        decades = sorted({decade_label(y) for (y, *_rest) in MILESTONES})
+        """Llena los menús de década y etiqueta con los conteos precalculados"""
         menu = self.decade_menu["menu"]
         menu.delete(0, "end")
-        menu.add_command(label="Todas las décadas",
-                        command=lambda v="Todas las décadas": self.decade_var.set(v) or self.on_decade_change(v))
-        for d in decades:
-            menu.add_command(label=d, command=lambda v=d: self.decade_var.set(v) or self.on_decade_change(v))
-
-    def on_decade_change(self, *_):
-        dec = self.decade_var.get()
-        self.current_decade = None if dec == "Todas las décadas" else dec
+        menu.add_command(label=ALL_DECADES,
+                        command=lambda: self.decade_var.set(ALL_DECADES) or self.on_decade_change(None))
+        for d, count in self.facets.decade_counts():
+            label = f"{d} ({count})"
+            menu.add_command(label=label,
+                             command=lambda v=d, l=label: self.decade_var.set(l) or self.on_decade_change(v))
+
+        menu = self.tag_menu["menu"]
+        menu.delete(0, "end")
+        menu.add_command(label=ALL_TAGS,
+                        command=lambda: self.tag_var.set(ALL_TAGS) or self.on_tag_change(None))
+        for tag_id, count in self.facets.tag_counts(TAG_MENU_LIMIT):
+            label = f"{self.table.tag_names[tag_id]} ({count})"
+            menu.add_command(label=label,
+                             command=lambda v=tag_id, l=label: self.tag_var.set(l) or self.on_tag_change(v))
+
+    def on_decade_change(self, decade):
+        self.current_decade = decade
         self.apply_filters()
 
-    def on_search(self, *_):
+    def on_tag_change(self, tag_id):
+        self.current_tag = tag_id
         self.apply_filters()
 
+    def on_search(self, *_):
+        # Ignorar teclas que no cambian el texto (flechas, Shift, ...)
+        query = self.search_var.get()
+        if query == self._last_query:
+            return
+        self._last_query = query
+        self.apply_filters(SEARCH_DEBOUNCE_MS)
+
     def clear_filters(self):
         self.current_decade = None
-        self.decade_var.set("Todas las décadas")
+        self.current_tag = None
+        self.decade_var.set(ALL_DECADES)
+        self.tag_var.set(ALL_TAGS)
         self.search_var.set("")
+        self._last_query = ""
         self.apply_filters()
 
-    def apply_filters(self):
-        query = self.search_var.get().strip().lower()
-        dec = self.current_decade
-
-        def match(item):
-            y, title, desc, tags, _img = item
-            if dec and decade_label(y) != dec:
-                return False
-            if not query:
-                return True
-            blob = " ".join([
-                str(y), title.lower(), desc.lower(), " ".join(t.lower() for t in tags)
-            ])
-            return query in blob
-
-        self.filtered = [m for m in MILESTONES if match(m)]
+    def apply_filters(self, delay_ms=0, keep=None, reshow=True):
+        """Filtra en el hilo de búsqueda y actualiza la lista al terminar.
+
+        Con ``keep`` (identificador de un hito) se conserva ese hito
+        seleccionado si sigue en el resultado.
+        """
+        callback = self.on_filtered
+        if keep is not None:
+            callback = lambda ids: self.on_filtered(ids, keep, reshow)
+        self.search_pipeline.request((self.search_var.get(), self.current_decade, self.current_tag),
+                                     callback, delay_ms)
+
+    def filter_ids(self, query, decade, tag):
+        """Identificadores de los hitos que cumplen los filtros (hilo de búsqueda)"""
+        with TRACER.span("filter.search"):
+            return self.catalog.filter(query, decade, tag, self.searcher)
+
+    def on_filtered(self, ids, keep=None, reshow=True):
+        with TRACER.span("filter.apply"):
+            self._apply_filtered(ids, keep, reshow)
+
+    def _apply_filtered(self, ids, keep, reshow):
+        self.filtered = ids
         self.refresh_list()
-        if self.filtered:
+        if not self.filtered:
             self.show_item(0)
+            return
+        pos = 0
+        if keep is not None and keep in ids:
+            pos = ids.index(keep)
+            if not reshow:
+                # El hito no cambió: sólo se mueve la selección (sin cortar la lectura)
+                self.current_index = pos
+                self.event_list.select(pos)
+                return
+        self.show_item(pos)
+
+    def on_catalog_change(self, diff, quiz):
+        """Aplica los cambios del catálogo y conserva el hito seleccionado"""
+        removed, changed, added = diff
+        if quiz != (self.catalog.quiz if self.catalog.quiz_is_external else None):
+            self.catalog.set_quiz(quiz)
+            self.quiz_btn.config(text=self.quiz_label())
+        if not (removed or changed or added):
+            return
+        current = self.filtered[self.current_index] if self.filtered else None
+        touched = set(removed) | {i for i, _row in changed}
+        if self.thumbs:
+            for i in touched:
+                path = self.image_path(i)
+                if path:
+                    self.thumbs.discard(path)
+        with TRACER.span("catalog.apply"):
+            self.catalog.apply(diff)
+        with self.catalog.lock:
+            self.searcher.clear()
+        self.populate_decades()
+        self.apply_filters(keep=current, reshow=current in touched)
+        if self.generated_quiz:
+            self._next_quiz = None
+            self.prepare_quiz()
+        print(f"🔄 Catálogo recargado: {len(added)} nuevos, {len(changed)} cambiados, "
+              f"{len(removed)} quitados")
 
     def refresh_list(self):
-        self.listbox.delete(0, "end")
-        for y, title, *_ in self.filtered:
-            self.listbox.insert("end", f"{y} — {title}")
+        with TRACER.span("refresh_list"):
+            self.event_list.set_items(len(self.filtered), self.row_label)
 
-    def on_list_select(self, *_):
-        idx = self.listbox.curselection()
-        if not idx:
-            return
-        self.current_index = idx[0]
+    def row_label(self, pos: int) -> str:
+        i = self.filtered[pos]
+        return f"{self.table.years[i]} — {self.table.titles[i]}"
+
+    def on_list_select(self, pos: int):
+        self.current_index = pos
         self.show_item(self.current_index)
 
     def show_item(self, idx: int):
+        with TRACER.span("show_item"):
+            self._show_item(idx)
+
+    def _show_item(self, idx: int):
         # Detener cualquier lectura en curso
         self.tts.stop()
+        self._resume = None
         if hasattr(self, 'tts_status'):
             self.tts_status.config(text="")
         
@@ -651,32 +1710,26 @@ class TimelineApp(tk.Tk):
 
         idx = max(0, min(idx, len(self.filtered) - 1))
         self.current_index = idx
-        y, title, desc, tags, img_name = self.filtered[idx]
-        
-        self.title_lbl.config(text=f"{title}")
-        self.meta_lbl.config(text=f"📅 Año: {y} • 📊 Década: {decade_label(y)} • 🏷️ Etiquetas: {', '.join(tags)}")
-        self.set_body(desc)
-
-        # Imagen opcional
-        img_path = os.path.join("assets", img_name) if img_name else None
-        if PIL_AVAILABLE and img_name and os.path.exists(img_path):
-            try:
-                im = Image.open(img_path)
-                im.thumbnail((900, 400))
-                self._photo = ImageTk.PhotoImage(im)
-                self.set_image(self._photo)
-            except Exception:
+        with TRACER.span("show_item.text"):
+            y, title, desc, tags, _img = self.table.row(self.filtered[idx])
+
+            self.title_lbl.config(text=f"{title}")
+            self.meta_lbl.config(text=f"📅 Año: {y} • 📊 Década: {decade_label(y)} • 🏷️ Etiquetas: {', '.join(tags)}")
+            self.set_body(desc)
+
+        # Imagen opcional: se pide al cargador y se muestra cuando esté lista
+        with TRACER.span("show_item.image"):
+            self._image_path = self.image_path(self.filtered[idx])
+            if self.thumbs and self._image_path:
+                thumb = self.thumbs.request(self._image_path,
+                                            lambda im, p=self._image_path: self.on_thumbnail(p, im))
+                self.on_thumbnail(self._image_path, thumb)
+                self.prefetch_neighbours()
+            else:
                 self.set_image(None)
-        else:
-            self.set_image(None)
 
         # Selección en la lista
-        try:
-            self.listbox.selection_clear(0, "end")
-            self.listbox.selection_set(self.current_index)
-            self.listbox.see(self.current_index)
-        except Exception:
-            pass
+        self.event_list.select(self.current_index)
 
     def set_body(self, text: str):
         self.body_text.configure(state="normal")
@@ -684,6 +1737,31 @@ class TimelineApp(tk.Tk):
         self.body_text.insert("1.0", text)
         self.body_text.configure(state="disabled")
 
+    def image_path(self, i: int):
+        img_name = self.table.images[i]
+        return os.path.join("assets", img_name) if img_name else None
+
+    def on_thumbnail(self, path, thumb):
+        """Muestra la miniatura si todavía corresponde al hito actual"""
+        if path != self._image_path:
+            return
+        if thumb is None:
+            self.set_image(None)
+            return
+        with TRACER.span("thumbnail.photo"):
+            self._photo = ImageTk.PhotoImage(thumb)
+            self.set_image(self._photo)
+
+    def prefetch_neighbours(self):
+        """Precarga las imágenes del hito anterior y siguiente"""
+        n = len(self.filtered)
+        paths = []
+        for step in (1, -1):
+            path = self.image_path(self.filtered[(self.current_index + step) % n])
+            if path:
+                paths.append(path)
+        self.thumbs.prefetch(paths)
+
     def set_image(self, photo_or_none):
         if photo_or_none:
             self.image_panel.configure(image=photo_or_none, text="")
@@ -693,33 +1771,84 @@ class TimelineApp(tk.Tk):
             self.image_panel.image = None
 
     def speak_current(self):
-        """Lee el contenido actual en voz alta"""
+        """Lee el contenido actual en voz alta, frase por frase"""
         if not self.filtered or not self.tts.is_available():
             return
         
-        y, title, desc, tags, _img = self.filtered[self.current_index]
+        i = self.filtered[self.current_index]
+        y, title, desc = self.table.years[i], self.table.titles[i], self.table.descriptions[i]
         
         # Construir texto completo para leer
-        text_to_speak = f"{title}. Año {y}. {desc}"
+        text_to_speak = narration_text(y, title, desc)
+        self._sentences = split_sentences(text_to_speak)
+
+        # Reanudar desde la frase donde se detuvo este mismo hito
+        start = self._resume[1] if self._resume and self._resume[0] == i else 0
+        self._resume = None
         
         # Actualizar estado
         if hasattr(self, 'tts_status'):
             self.tts_status.config(text="🔊 Leyendo...", fg=COLORS['success'])
         
-        # Callback cuando termine de hablar
-        def on_finish():
-            if hasattr(self, 'tts_status'):
-                self.tts_status.config(text="✅ Lectura completada", fg=COLORS['info'])
-        
-        # Iniciar lectura
-        self.tts.speak(text_to_speak, callback=on_finish)
-    
+        # Iniciar lectura (reemplaza cualquier lectura anterior)
+        self.tts.stop()
+        self._speaking_item = i
+        self._utterance = self.tts.speak(text_to_speak, start=start)
+
     def stop_speech(self):
-        """Detiene la lectura en voz alta"""
+        """Detiene la lectura en voz alta (la próxima lectura continúa desde esta frase)"""
+        if self._utterance is not None and self._sentences:
+            self._resume = (self._speaking_item, self._sentence_pos)
         self.tts.stop()
+        self._utterance = None
+        self.highlight_sentence(None)
         if hasattr(self, 'tts_status'):
             self.tts_status.config(text="⏸️ Detenido", fg=COLORS['warning'])
 
+    def on_tts_event(self, _event=None):
+        """Procesa los avisos del hilo de voz (corre en el hilo de Tk)"""
+        while True:
+            try:
+                kind, utt_id, data = self.tts.events.get_nowait()
+            except queue.Empty:
+                break
+            if not hasattr(self, 'tts_status'):
+                continue
+            if kind == "unavailable":
+                self.tts_status.config(text="⚠️ Síntesis de voz no disponible", fg=COLORS['warning'])
+                continue
+            if utt_id != self._utterance:
+                continue
+            if kind == "sentence":
+                self._sentence_pos, count = data
+                self.tts_status.config(text=f"🔊 Frase {self._sentence_pos + 1}/{count}",
+                                       fg=COLORS['success'])
+                self.highlight_sentence(self._sentences[self._sentence_pos])
+            elif kind == "word":
+                self.tts_status.config(text=f"🔊 Frase {self._sentence_pos + 1}/{len(self._sentences)}"
+                                            f" · {data}%", fg=COLORS['success'])
+            elif kind == "done":
+                self.tts_status.config(text="✅ Lectura completada", fg=COLORS['info'])
+                self.highlight_sentence(None)
+            elif kind == "error":
+                self.tts_status.config(text="⚠️ Error en la voz", fg=COLORS['danger'])
+                self.highlight_sentence(None)
+
+    def highlight_sentence(self, sentence):
+        """Resalta en el texto la frase que se está leyendo"""
+        self.body_text.tag_remove("speaking", "1.0", "end")
+        if not sentence:
+            return
+        start = self.body_text.search(sentence, "1.0", stopindex="end")
+        if start:
+            self.body_text.tag_add("speaking", start, f"{start}+{len(sentence)}c")
+
+    def on_rate_change(self, value):
+        self.tts.set_rate(int(float(value)))
+
+    def on_tts_cache_toggle(self):
+        self.tts.use_cache = self.tts_cache_var.get()
+    
     def prev_item(self):
         if not self.filtered:
             return
@@ -738,17 +1867,12 @@ class TimelineApp(tk.Tk):
             return
         path = filedialog.asksaveasfilename(
             defaultextension=".csv",
-            filetypes=[("CSV", "*.csv")],
+            filetypes=[("CSV", "*.csv"), ("CSV comprimido", "*.csv.gz *.csv.xz")],
             title="Guardar línea del tiempo (CSV)"
         )
         if not path:
             return
-        with open(path, "w", newline="", encoding="utf-8") as f:
-            w = csv.writer(f)
-            w.writerow(["year", "title", "description", "tags"])
-            for y, title, desc, tags, _img in self.filtered:
-                w.writerow([y, title, desc, ";".join(tags)])
-        messagebox.showinfo("Exportar CSV", f"✅ Archivo guardado:\n{path}")
+        self.start_export("Exportar CSV", write_csv, path)
 
     def export_json(self):
         if not self.filtered:
@@ -756,27 +1880,111 @@ class TimelineApp(tk.Tk):
             return
         path = filedialog.asksaveasfilename(
             defaultextension=".json",
-            filetypes=[("JSON", "*.json")],
+            filetypes=[("JSON", "*.json"),
+                       ("JSON Lines", "*.jsonl"),
+                       ("JSON comprimido", "*.json.gz *.json.xz *.jsonl.gz *.jsonl.xz")],
             title="Guardar línea del tiempo (JSON)"
         )
         if not path:
             return
-        data = [
-            {"year": y, "title": title, "description": desc, "tags": tags}
-            for y, title, desc, tags, _img in self.filtered
-        ]
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        messagebox.showinfo("Exportar JSON", f"✅ Archivo guardado:\n{path}")
+        ext, _ = split_export_path(path)
+        self.start_export("Exportar JSON", write_jsonl if ext == ".jsonl" else write_json, path)
+
+    def export_binary(self):
+        if not self.filtered:
+            messagebox.showinfo("Exportar binario", "No hay elementos para exportar.")
+            return
+        path = filedialog.asksaveasfilename(
+            defaultextension=".tlc",
+            filetypes=[("Binario por columnas", "*.tlc"),
+                       ("Binario comprimido", "*.tlc.gz *.tlc.xz")],
+            title="Guardar línea del tiempo (binario)"
+        )
+        if not path:
+            return
+        self.start_export("Exportar binario", write_columnar, path)
+
+    def start_export(self, title, writer, path):
+        """Exporta los hitos filtrados en segundo plano, con ventana de avance"""
+        job = ExportJob(self, writer, path, self.table, self.filtered)
+        dialog = ExportDialog(self, title, len(self.filtered), on_cancel=job.cancel)
+        job.on_progress = dialog.set_progress
+        job.on_done = lambda result, error: self.on_export_done(dialog, title, path, result, error)
+        job.start()
+
+    def on_export_done(self, dialog, title, path, result, error):
+        dialog.destroy()
+        if result == "done":
+            messagebox.showinfo(title, f"✅ Archivo guardado:\n{path}")
+        elif result == "error":
+            messagebox.showerror(title, f"No se pudo guardar el archivo:\n{error}")
+
+    def toggle_perf_overlay(self, _event=None):
+        """Muestra u oculta el panel de rendimiento; mostrarlo activa la instrumentación"""
+        if self.perf_overlay is None:
+            self.perf_overlay = PerfOverlay(self)
+        if self.perf_overlay.winfo_ismapped():
+            self.perf_overlay.hide()
+        else:
+            TRACER.enabled = True
+            self.perf_overlay.show()
+
+    def prepare_quiz(self):
+        """Genera en un hilo aparte el cuestionario con la semilla actual"""
+        seed = self.quiz_seed
+        threading.Thread(target=self._generate_quiz, args=(seed,), daemon=True, name="quiz-bank").start()
+
+    def _generate_quiz(self, seed):
+        with TRACER.span("quiz.generate"):
+            questions = self.catalog.generate_quiz(seed)
+        try:
+            self.after(0, self._store_quiz, seed, questions)
+        except RuntimeError:
+            # La ventana ya se cerró
+            pass
+
+    def _store_quiz(self, seed, questions):
+        if seed == self.quiz_seed:
+            self._next_quiz = (seed, questions)
+            self.quiz_btn.config(text=self.quiz_label())
+
+    def uses_generated_quiz(self):
+        """Un cuestionario externo (--quiz o incluido en el catálogo) se usa tal cual"""
+        return self.generated_quiz and not self.catalog.quiz_is_external
+
+    def quiz_label(self):
+        count = len(self.catalog.quiz)
+        if self.uses_generated_quiz():
+            # El generado puede ser más corto si el catálogo tiene pocos hitos
+            if self._next_quiz is None:
+                count = QUIZ_LENGTH
+            elif self._next_quiz[1]:
+                count = len(self._next_quiz[1])
+        return f"📝 Iniciar cuestionario ({count} preguntas)"
 
     def start_quiz(self):
-        QuizWindow(self, QUIZ)
+        if not self.uses_generated_quiz():
+            QuizWindow(self, self.catalog.quiz)
+            return
+        seed = self.quiz_seed
+        if self._next_quiz is not None and self._next_quiz[0] == seed:
+            questions = self._next_quiz[1]
+        else:
+            questions = self.catalog.generate_quiz(seed)
+        if not questions:
+            # Catálogo sin hitos suficientes para generar preguntas
+            questions, seed = self.catalog.quiz, None
+        QuizWindow(self, questions, seed)
+        self.quiz_seed += 1
+        self._next_quiz = None
+        self.prepare_quiz()
 
 
 class QuizWindow(tk.Toplevel):
-    def __init__(self, master: TimelineApp, questions):
+    def __init__(self, master: TimelineApp, questions, seed=None):
         super().__init__(master)
-        self.title("📝 Cuestionario: Historia de la graficación")
+        self.title("📝 Cuestionario: Historia de la graficación"
+                   + (f" (semilla {seed})" if seed is not None else ""))
         self.geometry("800x650")
         self.resizable(False, False)
         self.configure(bg=COLORS['bg_card'])
@@ -908,42 +2116,69 @@ class QuizWindow(tk.Toplevel):
 
     def finish(self):
         self.user_answers[self.index] = self.opt_var.get()
-        score = 0
+        report = grade_quiz(self.questions, self.user_answers)
         details = []
-        for i, q in enumerate(self.questions):
-            correct = q["answer"]
-            user = self.user_answers[i]
-            ok = (user == correct)
-            if ok:
-                score += 1
+        for i, (q, (ok, user, correct)) in enumerate(zip(self.questions, report["results"])):
             emoji = "✅" if ok else "❌"
             details.append(f"{emoji} Pregunta {i+1}: {q['q']}\n"
                           f"   Tu respuesta: {q['options'][user] if user >= 0 else '(Sin responder)'}\n"
                           f"   Correcta: {q['options'][correct]}\n")
         
-        pct = round(100 * score / len(self.questions), 1)
-        
-        # Determinar calificación
-        if pct >= 90:
-            grade = "¡Excelente! 🌟"
-            color = "green"
-        elif pct >= 70:
-            grade = "¡Muy bien! 👍"
-            color = "blue"
-        elif pct >= 50:
-            grade = "Aprobado ✓"
-            color = "orange"
-        else:
-            grade = "Necesitas repasar 📚"
-            color = "red"
-        
-        result_text = f"PUNTUACIÓN FINAL\n\n{score}/{len(self.questions)} correctas ({pct}%)\n\n{grade}\n\n" + "\n".join(details)
+        result_text = (f"PUNTUACIÓN FINAL\n\n{report['score']}/{report['total']} correctas ({report['pct']}%)\n\n"
+                       f"{report['grade']}\n\n" + "\n".join(details))
         
         messagebox.showinfo("Resultado del Cuestionario", result_text)
         self.destroy()
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Historia y evolución de la graficación por computadora")
+    parser.add_argument("--warm-cache", action="store_true",
+                        help="genera en paralelo las miniaturas de assets/ y termina")
+    parser.add_argument("--prerender-tts", action="store_true",
+                        help=f"sintetiza en paralelo la narración de todos los hitos en {TTS_CACHE_DIR}/ y termina")
+    parser.add_argument("--catalog", metavar="RUTA",
+                        help="catálogo de hitos externo (CSV, JSON, JSON Lines o .tlc; "
+                             f"se compila a {CATALOG_CACHE_DIR}/ la primera vez)")
+    parser.add_argument("--quiz", metavar="RUTA",
+                        help="cuestionario externo (JSON) si el catálogo no trae uno")
+    parser.add_argument("--quiz-seed", type=int, metavar="N",
+                        help="semilla del primer cuestionario generado (las siguientes son N+1, N+2, ...)")
+    parser.add_argument("--fixed-quiz", action="store_true",
+                        help="usar las 8 preguntas fijas en lugar de generarlas de los hitos")
+    parser.add_argument("--trace", metavar="RUTA",
+                        help="mide las rutas críticas y guarda la traza JSON en RUTA al salir (F12 muestra el panel)")
+    args = parser.parse_args()
+    if args.trace:
+        TRACER.enabled = True
+    try:
+        catalog = Catalog.load(args.catalog, args.quiz) if args.catalog else Catalog.builtin(args.quiz)
+    except (OSError, ValueError) as e:
+        raise SystemExit(f"No se pudo cargar el catálogo {args.catalog or args.quiz}: {e}")
+
+    if args.prerender_tts:
+        if not TTS_AVAILABLE:
+            print("⚠️ pyttsx3 no disponible. Instala con: pip install pyttsx3")
+            sys.exit(1)
+        table = catalog.table
+        texts = [sentence
+                 for i in range(len(table))
+                 for sentence in split_sentences(narration_text(table.years[i], table.titles[i],
+                                                                table.descriptions[i]))]
+        print(f"🔊 Sintetizando {len(texts)} narraciones en {TTS_CACHE_DIR}/ ...")
+        count = prerender_narrations(texts)
+        print(f"✅ {count} narraciones listas")
+        sys.exit(0)
+
+    if args.warm_cache:
+        if not PIL_AVAILABLE:
+            print("⚠️ Pillow no disponible. Instala con: pip install pillow")
+            sys.exit(1)
+        print(f"🖼️ Generando miniaturas en {THUMB_CACHE_DIR}/ ...")
+        count = warm_thumbnail_cache()
+        print(f"✅ {count} miniaturas listas")
+        sys.exit(0)
+
     print("="*70)
     print("📚 HISTORIA Y EVOLUCIÓN DE LA GRAFICACIÓN POR COMPUTADORA")
     print("="*70)
@@ -961,5 +2196,7 @@ if __name__ == "__main__":
         print("   Para habilitar síntesis de voz, instala:")
         print("   pip install pyttsx3\n")
     
-    app = TimelineApp()
-    app.mainloop()
\ No newline at end of file
+    app = TimelineApp(catalog, args.quiz_seed, generated_quiz=not args.fixed_quiz)
+    app.mainloop()
+    if args.trace:
+        print(f"📈 Traza guardada en {args.trace} ({TRACER.dump(args.trace)} spans)")
\ No newline at end of file
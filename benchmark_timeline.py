@@ -0,0 +1,326 @@
+"""
+Benchmarks de la línea del tiempo (sin pantalla)
+Descripción:
+ - Genera catálogos sintéticos con la forma de MILESTONES (de 10 a 100 000 hitos;
+   1 000 000 sólo si se pide con --sizes)
+ - Mide la construcción del catálogo, filtros y búsqueda (apply_filters), refresh_list,
+   show_item, las exportaciones, la generación de cuestionarios y QuizWindow.finish
+ - Reporta percentiles de latencia (p50/p90/p99) y memoria pico (tracemalloc)
+ - Guarda una línea base en benchmarks/baseline.json y compara contra ella
+
+Por defecto los widgets de Tk se reemplazan por objetos vacíos, así que no se
+necesita pantalla. Con ``--tk real`` se usa la ventana real (p. ej. con
+``xvfb-run python benchmark_timeline.py --tk real``).
+
+Uso:
+    python benchmark_timeline.py --sizes 10 1000 100000 1000000   # incluye el millón de hitos
+    python benchmark_timeline.py --save        # guarda la línea base
+    python benchmark_timeline.py --compare     # falla si algo empeoró
+"""
+import argparse
+import importlib.util
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import timeline_core as core
+
+APP_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Graficacion29-01-26.py")
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "baseline.json")
+DEFAULT_SIZES = (10, 1_000, 100_000)
+QUICK_SIZES = (10, 1_000, 10_000)
+REPEAT = 30              # Muestras por operación
+BUDGET_S = 3.0           # Tiempo máximo por operación (se toma al menos una muestra)
+REGRESSION_FACTOR = 1.25 # p50 más lento que la línea base por este factor = regresión
+REGRESSION_MIN_MS = 1.0  # ... y por al menos estos milisegundos (evita ruido)
+QUERIES = [
+    ("sketchpad", None, None),
+    ("gpu shaders", None, None),
+    ("ray tr", None, None),
+    ("skechpad", None, None),
+    ("", "1990s", None),
+    ("render", "1980s", 0),
+    ("", None, 1),
+]
+
+
+def load_app():
+    """Importa el programa principal (su nombre de archivo no es un módulo válido)"""
+    spec = importlib.util.spec_from_file_location("graficacion", APP_FILE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# ---------------------------
+# Catálogos sintéticos
+# ---------------------------
+def synthetic_milestones(count, seed=0):
+    """``count`` hitos con la forma de MILESTONES, armados con palabras de los reales"""
+    rng = random.Random(seed)
+    title_words = sorted({w for m in core.MILESTONES for w in m[1].split()})
+    desc_words = sorted({w for m in core.MILESTONES for w in m[2].split()})
+    tags = sorted({t for m in core.MILESTONES for t in m[3]}) + [f"tema{k}" for k in range(200)]
+    images = [m[4] for m in core.MILESTONES]
+    for _ in range(count):
+        yield (rng.randint(1950, 2024),
+               " ".join(rng.choices(title_words, k=rng.randint(2, 5))),
+               " ".join(rng.choices(desc_words, k=rng.randint(10, 25))),
+               rng.sample(tags, rng.randint(1, 4)),
+               rng.choice(images))
+
+
+# ---------------------------
+# Tk falso
+# ---------------------------
+class StubWidget:
+    """Reemplazo de un widget de Tk: acepta cualquier método y no hace nada"""
+
+    def __getattr__(self, name):
+        return self._noop
+
+    @staticmethod
+    def _noop(*args, **kwargs):
+        return None
+
+
+class StubVar:
+    def __init__(self, value=None):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+def stub_app(app, catalog):
+    """``TimelineApp`` sin ventana: los métodos de la aplicación con widgets vacíos"""
+    host = app.TimelineApp.__new__(app.TimelineApp)
+    host.catalog = catalog
+    host.table = catalog.table
+    host.index = catalog.index
+    host.facets = catalog.facets
+    host.searcher = core.IncrementalSearch(catalog.index)
+    host.tts = StubWidget()
+    host.thumbs = None
+    host._resume = None
+    host._image_path = None
+    host.filtered = catalog.table.all_ids()
+    host.current_index = 0
+    for name in ("title_lbl", "meta_lbl", "body_text", "image_panel", "tts_status"):
+        setattr(host, name, StubWidget())
+    lst = app.VirtualList.__new__(app.VirtualList)
+    lst.on_select = host.on_list_select
+    lst.count = 0
+    lst.formatter = None
+    lst.top = 0
+    lst.rows = 20
+    lst.selected = None
+    lst.listbox = StubWidget()
+    lst.scrollbar = StubWidget()
+    host.event_list = lst
+    return host
+
+
+def stub_quiz(app, questions, seed=0):
+    """``QuizWindow`` sin ventana, con respuestas al azar"""
+    rng = random.Random(seed)
+    quiz = app.QuizWindow.__new__(app.QuizWindow)
+    quiz.questions = list(questions)
+    quiz.index = 0
+    quiz.user_answers = [rng.randint(-1, len(q["options"]) - 1) for q in quiz.questions]
+    quiz.opt_var = StubVar(quiz.user_answers[0])
+    quiz.destroy = lambda: None
+    return quiz
+
+
+def real_app(app, catalog):
+    root = app.TimelineApp(catalog)
+    root.withdraw()
+    root.update()
+    return root
+
+
+def real_quiz(app, root, questions, seed=0):
+    rng = random.Random(seed)
+    quiz = app.QuizWindow(root, questions)
+    quiz.withdraw()
+    quiz.user_answers = [rng.randint(-1, len(q["options"]) - 1) for q in quiz.questions]
+    quiz.opt_var.set(quiz.user_answers[0])
+    return quiz
+
+
+# ---------------------------
+# Medición
+# ---------------------------
+def percentile(samples, p):
+    ordered = sorted(samples)
+    k = max(0, min(len(ordered) - 1, round(p / 100 * len(ordered) + 0.5) - 1))
+    return ordered[k]
+
+
+def measure(fn, repeat=REPEAT, budget=BUDGET_S, setup=None):
+    """Ejecuta ``fn`` varias veces; retorna percentiles en ms y memoria pico en KB"""
+    samples = []
+    start = time.perf_counter()
+    while len(samples) < repeat and (not samples or time.perf_counter() - start < budget):
+        state = setup() if setup else None
+        t0 = time.perf_counter()
+        fn(state) if setup else fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    state = setup() if setup else None
+    tracemalloc.start()
+    fn(state) if setup else fn()
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"n": len(samples),
+            "p50": round(percentile(samples, 50), 4),
+            "p90": round(percentile(samples, 90), 4),
+            "p99": round(percentile(samples, 99), 4),
+            "peak_kb": round(peak / 1024, 1)}
+
+
+def bench_size(app, size, tk_mode, repeat, workdir):
+    results = {}
+    rows = list(synthetic_milestones(size))
+
+    results["catalog.build"] = measure(lambda: core.Catalog(core.MilestoneTable(rows), None),
+                                       repeat=max(1, repeat // 10))
+    catalog = core.Catalog(core.MilestoneTable(rows), None)
+    rows = None
+    cache_path = os.path.join(workdir, f"catalog-{size}.tlm")
+    catalog.save_cache(cache_path)
+    results["catalog.map"] = measure(lambda: core.Catalog.open_cache(cache_path), repeat)
+
+    host = real_app(app, catalog) if tk_mode == "real" else stub_app(app, catalog)
+    queries = iter(QUERIES * (repeat + 1))
+
+    def filter_once():
+        query, decade, tag = next(queries)
+        host.searcher.clear()
+        ids = host.filter_ids(query, decade, tag)
+        host.on_filtered(ids)
+
+    results["apply_filters"] = measure(filter_once, repeat)
+    host.filtered = catalog.table.all_ids()
+    results["refresh_list"] = measure(host.refresh_list, repeat)
+    positions = iter(random.Random(1).randrange(len(host.filtered)) for _ in range(repeat + 2))
+    results["show_item"] = measure(lambda: host.show_item(next(positions)), repeat)
+
+    ids = catalog.table.all_ids()
+    for ext in (".csv", ".json", ".jsonl", ".tlc", ".jsonl.gz"):
+        path = os.path.join(workdir, f"export{ext}")
+        fmt, compression = core.split_export_path(path)
+        writer, binary = core.EXPORT_FORMATS[fmt]
+
+        def export(path=path, writer=writer, binary=binary, compression=compression):
+            with core.open_export(path, "w", compression, binary) as f:
+                writer(f, catalog.table, ids)
+
+        results[f"export{ext}"] = measure(export, max(1, repeat // 10))
+
+    seeds = iter(range(repeat + 2))
+    results["quiz.generate"] = measure(lambda: catalog.generate_quiz(next(seeds)), repeat)
+
+    questions = [core.QUIZ[k % len(core.QUIZ)] for k in range(max(len(core.QUIZ), min(size, 10_000)))]
+    if tk_mode == "real":
+        results["quiz.finish"] = measure(lambda quiz: quiz.finish(), repeat,
+                                         setup=lambda: real_quiz(app, host, questions))
+        host.destroy()
+    else:
+        results["quiz.finish"] = measure(lambda quiz: quiz.finish(), repeat,
+                                         setup=lambda: stub_quiz(app, questions))
+    return results
+
+
+# ---------------------------
+# Línea base
+# ---------------------------
+def load_baseline(path=BASELINE_FILE):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_baseline(report, path=BASELINE_FILE):
+    baseline = load_baseline(path)
+    baseline.update(report)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+
+
+def compare(report, baseline):
+    """Lista de (tamaño, operación, p50 base, p50 nuevo) que empeoraron"""
+    regressions = []
+    for size, ops in report.items():
+        for op, stats in ops.items():
+            base = baseline.get(size, {}).get(op)
+            if not base:
+                continue
+            if (stats["p50"] > base["p50"] * REGRESSION_FACTOR
+                    and stats["p50"] - base["p50"] > REGRESSION_MIN_MS):
+                regressions.append((size, op, base["p50"], stats["p50"]))
+    return regressions
+
+
+def print_results(size, results, baseline):
+    print(f"\n📊 {size:,} hitos")
+    print(f"   {'operación':<18}{'n':>4}{'p50 ms':>11}{'p90 ms':>11}{'p99 ms':>11}{'pico KB':>12}{'vs base':>9}")
+    for op, st in results.items():
+        base = baseline.get(str(size), {}).get(op)
+        ratio = f"{st['p50'] / base['p50']:.2f}x" if base and base["p50"] else "—"
+        print(f"   {op:<18}{st['n']:>4}{st['p50']:>11.3f}{st['p90']:>11.3f}{st['p99']:>11.3f}"
+              f"{st['peak_kb']:>12,.1f}{ratio:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks sin pantalla de la línea del tiempo")
+    parser.add_argument("--sizes", type=int, nargs="+", help=f"tamaños de catálogo (por defecto {DEFAULT_SIZES})")
+    parser.add_argument("--quick", action="store_true", help=f"sólo tamaños chicos {QUICK_SIZES}")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="muestras por operación")
+    parser.add_argument("--tk", choices=("stub", "real"), default="stub",
+                        help="widgets vacíos (sin pantalla) o la ventana real")
+    parser.add_argument("--save", action="store_true", help=f"guarda los resultados en {BASELINE_FILE}")
+    parser.add_argument("--compare", action="store_true",
+                        help="termina con error si alguna operación empeoró respecto a la línea base")
+    parser.add_argument("--json", metavar="RUTA", help="escribe también los resultados en RUTA")
+    args = parser.parse_args()
+
+    sizes = args.sizes or (QUICK_SIZES if args.quick else DEFAULT_SIZES)
+    app = load_app()
+    # QuizWindow.finish muestra el resultado en un cuadro de diálogo
+    app.messagebox = StubWidget()
+    baseline = load_baseline()
+    report = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in sizes:
+            results = bench_size(app, size, args.tk, args.repeat, workdir)
+            report[str(size)] = results
+            print_results(size, results, baseline)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.save:
+        save_baseline(report)
+        print(f"\n💾 Línea base guardada en {BASELINE_FILE}")
+    if args.compare:
+        regressions = compare(report, baseline)
+        for size, op, old, new in regressions:
+            print(f"❌ {op} ({int(size):,} hitos): {old:.3f} ms → {new:.3f} ms")
+        if regressions:
+            sys.exit(1)
+        print("\n✅ Sin regresiones respecto a la línea base")
+
+
+if __name__ == "__main__":
+    main()
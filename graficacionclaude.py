@@ -1,10 +1,9 @@
+import queue
 import tkinter as tk
 from tkinter import scrolledtext
-import pyttsx3
 
-# Inicializar motor de voz
-engine = pyttsx3.init()
-engine.setProperty('rate', 170)  # Velocidad de la voz
+# Narración en segundo plano (compartida con las otras ventanas por década)
+from narracion import ServicioNarracion
 
 # Diccionario con contenido por década
 historia_contenido = {
@@ -43,10 +42,29 @@ def mostrar_texto_y_hablar(decada):
     text_area.delete(1.0, tk.END)
     text_area.insert(tk.END, f"{decada}:\n\n{contenido}")
     text_area.config(state='disabled')
-    
-    engine.stop()
-    engine.say(contenido)
-    engine.runAndWait()
+
+    # La narración corre en segundo plano: la ventana sigue respondiendo
+    # y otro botón puede interrumpirla
+    estado.config(text=f"🔊 Narrando {decada}...")
+    narrador.hablar(decada, contenido)
+
+
+# Aviso del hilo de voz al terminar una narración
+def al_terminar_narracion(evento=None):
+    while True:
+        try:
+            decada, resultado = narrador.terminadas.get_nowait()
+        except queue.Empty:
+            break
+        if resultado == "terminada":
+            estado.config(text=f"✅ {decada}: narración terminada")
+        elif resultado == "error":
+            estado.config(text="⚠️ Síntesis de voz no disponible")
+
+
+def detener_narracion():
+    narrador.detener()
+    estado.config(text="⏹ Narración detenida")
 
 # Crear ventana principal
 ventana = tk.Tk()
@@ -78,5 +96,20 @@ for i, decada in enumerate(historia_contenido):
                      command=lambda d=decada: mostrar_texto_y_hablar(d))
     boton.grid(row=0, column=i, padx=5, pady=5)
 
+# Botón para detener la narración
+boton_detener = tk.Button(frame_botones, text="⏹ Detener", width=15,
+                          font=("Arial", 10, "bold"), bg="#7f8c8d", fg="white",
+                          command=detener_narracion)
+boton_detener.grid(row=1, column=2, padx=5, pady=5)
+
+# Estado de la narración
+estado = tk.Label(ventana, text="", font=("Arial", 10, "italic"),
+                  bg="#f0f4f8", fg="#2c3e50")
+estado.pack(pady=5)
+
+# Servicio de narración en segundo plano
+narrador = ServicioNarracion(ventana)
+ventana.bind(ServicioNarracion.EVENTO, al_terminar_narracion)
+
 # Ejecutar ventana
 ventana.mainloop()
\ No newline at end of file
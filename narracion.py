@@ -0,0 +1,98 @@
+"""
+Narración en segundo plano para las ventanas por década
+(Graficaciondia2.py y graficacionclaude.py)
+Descripción:
+ - El motor de voz (pyttsx3) se crea la primera vez que se necesita
+ - Los textos se narran frase por frase (split_sentences de timeline_core)
+   en un hilo aparte, así que la ventana no se congela
+"""
+import queue
+import sys
+import threading
+import tkinter as tk
+
+from timeline_core import split_sentences
+
+VELOCIDAD = 170   # Velocidad de la voz (palabras por minuto)
+
+# Motor de voz: se crea la primera vez que se necesita, no al abrir la ventana
+engine = None
+
+
+def obtener_motor():
+    """Importa pyttsx3 y crea el motor de voz sólo en el primer uso"""
+    global engine
+    if engine is None:
+        import pyttsx3
+        engine = pyttsx3.init()
+        engine.setProperty('rate', VELOCIDAD)
+    return engine
+
+
+class ServicioNarracion:
+    """Narra textos en un hilo aparte para no congelar la ventana.
+
+    El hilo de voz es el único que usa el motor y narra frase por frase.
+    ``hablar`` interrumpe la narración en curso (al terminar la palabra
+    actual) y empieza la nueva. Al terminar cada narración deja el resultado
+    en ``terminadas`` y avisa a la ventana con el evento virtual
+    ``<<NarracionTerminada>>``.
+    """
+
+    EVENTO = "<<NarracionTerminada>>"
+
+    def __init__(self, ventana):
+        self.ventana = ventana
+        self.pedidos = queue.Queue()
+        self.terminadas = queue.Queue()
+        self.generacion = 0
+        self.interrumpir = threading.Event()
+        self.motor = None
+        threading.Thread(target=self._trabajar, daemon=True).start()
+
+    def hablar(self, clave, texto):
+        """Cancela la narración actual y narra ``texto``; ``clave`` identifica el aviso final"""
+        self.generacion += 1
+        self.interrumpir.set()
+        self.pedidos.put((self.generacion, clave, texto))
+
+    def detener(self):
+        self.generacion += 1
+        self.interrumpir.set()
+
+    def _trabajar(self):
+        if sys.platform == "win32":
+            # SAPI requiere inicializar COM en este hilo
+            try:
+                import comtypes
+                comtypes.CoInitialize()
+            except Exception:
+                pass
+        try:
+            self.motor = obtener_motor()
+            self.motor.connect('started-word', self._al_decir_palabra)
+        except Exception as e:
+            print(f"No se pudo iniciar la voz: {e}")
+            self._avisar(None, "error")
+            return
+
+        while True:
+            generacion, clave, texto = self.pedidos.get()
+            for frase in split_sentences(texto):
+                self.interrumpir.clear()
+                if generacion != self.generacion:
+                    break
+                self.motor.say(frase)
+                self.motor.runAndWait()
+            self._avisar(clave, "terminada" if generacion == self.generacion else "interrumpida")
+
+    def _al_decir_palabra(self, nombre, posicion, largo):
+        if self.interrumpir.is_set():
+            self.motor.stop()
+
+    def _avisar(self, clave, resultado):
+        self.terminadas.put((clave, resultado))
+        try:
+            self.ventana.event_generate(self.EVENTO, when="tail")
+        except (RuntimeError, tk.TclError):
+            pass  # La ventana ya se cerró
@@ -0,0 +1,235 @@
+"""
+Línea de comandos de la línea del tiempo (sin interfaz gráfica)
+Descripción:
+ - query: búsqueda por relevancia con filtros de década y etiqueta
+ - facets: décadas y etiquetas con su número de hitos
+ - export: exporta los hitos filtrados (CSV, JSON, JSON Lines, .tlc; .gz/.xz)
+ - quiz: cuestionario generado de los hitos con una semilla (JSON compatible con --quiz)
+ - grade: califica respuestas del cuestionario (con --seed, del cuestionario generado)
+ - grade-batch: califica miles de intentos con NumPy (ver timeline_grading.py)
+
+Sólo usa timeline_core, así que arranca sin importar tkinter, Pillow ni pyttsx3.
+
+Uso:
+    python timeline_cli.py query "ray tracing" --decade 2010s
+    python timeline_cli.py facets
+    python timeline_cli.py --catalog hitos.csv export salida.jsonl.gz --tag GPU
+    python timeline_cli.py quiz --seed 42 > cuestionario.json
+    python timeline_cli.py grade respuestas.json --seed 42
+    python timeline_cli.py grade-batch intentos.csv --students notas.csv --items preguntas.json
+"""
+import argparse
+import json
+import os
+import sys
+
+from timeline_core import (
+    CATALOG_CACHE_DIR, EXPORT_FORMATS, QUIZ_LENGTH, Catalog,
+    export_record, grade_quiz, open_export, split_export_path,
+)
+
+
+def load_catalog(args) -> Catalog:
+    try:
+        if args.catalog:
+            return Catalog.load(args.catalog, args.quiz)
+        return Catalog.builtin(args.quiz)
+    except (OSError, ValueError) as e:
+        raise SystemExit(f"No se pudo cargar el catálogo {args.catalog or args.quiz}: {e}")
+
+
+def resolve_tag(catalog: Catalog, name):
+    """Id de la etiqueta ``name`` (sin distinguir mayúsculas); error si no existe"""
+    if name is None:
+        return None
+    tag_ids = catalog.table.tag_ids
+    if name in tag_ids:
+        return tag_ids[name]
+    for tag, tag_id in tag_ids.items():
+        if tag.casefold() == name.casefold():
+            return tag_id
+    raise SystemExit(f"Etiqueta desconocida: {name}")
+
+
+def quiz_questions(catalog: Catalog, args):
+    """Preguntas a calificar: las generadas con ``--seed`` o las del catálogo"""
+    if args.seed is None:
+        return catalog.quiz
+    return catalog.generate_quiz(args.seed, args.length)
+
+
+def filtered_ids(catalog: Catalog, args):
+    return catalog.filter(args.query or "", args.decade, resolve_tag(catalog, args.tag))
+
+
+def cmd_query(catalog: Catalog, args):
+    ids = filtered_ids(catalog, args)
+    shown = ids[:args.limit] if args.limit else ids
+    if args.json:
+        json.dump([dict(id=i, **export_record(catalog.table, i)) for i in shown],
+                  sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return
+    t = catalog.table
+    for i in shown:
+        print(f"{t.years[i]}  {t.titles[i]}  [{', '.join(t.tags(i))}]")
+    print(f"({len(shown)} de {len(ids)} hitos)", file=sys.stderr)
+
+
+def cmd_facets(catalog: Catalog, args):
+    decades = catalog.facets.decade_counts()
+    tags = [(catalog.table.tag_names[tag_id], count)
+            for tag_id, count in catalog.facets.tag_counts(args.tags)]
+    if args.json:
+        json.dump({"decades": dict(decades), "tags": dict(tags)}, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return
+    print("Décadas:")
+    for label, count in decades:
+        print(f"  {label:<8}{count:>8}")
+    print("Etiquetas:")
+    for name, count in tags:
+        print(f"  {name:<24}{count:>8}")
+
+
+def cmd_export(catalog: Catalog, args):
+    ext, compression = split_export_path(args.path)
+    if ext not in EXPORT_FORMATS:
+        raise SystemExit(f"Formato no reconocido: {args.path} "
+                         f"(use {', '.join(EXPORT_FORMATS)}, opcionalmente con .gz o .xz)")
+    writer, binary = EXPORT_FORMATS[ext]
+    ids = filtered_ids(catalog, args)
+    tmp = f"{args.path}.part"
+    try:
+        with open_export(tmp, "w", compression, binary) as f:
+            writer(f, catalog.table, ids)
+        os.replace(tmp, args.path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    print(f"✅ {len(ids)} hitos guardados en {args.path}", file=sys.stderr)
+
+
+def cmd_quiz(catalog: Catalog, args):
+    questions = catalog.generate_quiz(args.seed, args.length)
+    json.dump(questions, sys.stdout, ensure_ascii=False, indent=2)
+    print()
+
+
+def cmd_grade(catalog: Catalog, args):
+    """Califica un intento (lista de respuestas) o varios ({nombre: respuestas})"""
+    with open(args.answers, encoding="utf-8") as f:
+        data = json.load(f)
+    attempts = data if isinstance(data, dict) else {"respuestas": data}
+    quiz = quiz_questions(catalog, args)
+    reports = {}
+    for name, answers in attempts.items():
+        if len(answers) != len(quiz):
+            raise SystemExit(f"{name}: {len(answers)} respuestas para {len(quiz)} preguntas")
+        reports[name] = grade_quiz(quiz, answers)
+    if args.json:
+        json.dump({name: {k: r[k] for k in ("score", "total", "pct", "grade")} for name, r in reports.items()},
+                  sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return
+    for name, r in reports.items():
+        print(f"{name}: {r['score']}/{r['total']} ({r['pct']}%) {r['grade']}")
+
+
+def cmd_grade_batch(catalog: Catalog, args):
+    """Califica un archivo de intentos completo y reporta por alumno y por pregunta"""
+    # NumPy se importa sólo aquí para no retrasar el arranque de los demás comandos
+    try:
+        from timeline_grading import grade_batch, load_submissions, write_rows
+    except ImportError:
+        raise SystemExit("⚠️ NumPy no disponible. Instala con: pip install numpy")
+    try:
+        quiz = quiz_questions(catalog, args)
+        names, answers = load_submissions(args.submissions, len(quiz))
+        report = grade_batch(quiz, answers, names)
+        if args.students:
+            write_rows(args.students, report.student_rows())
+        if args.items:
+            write_rows(args.items, report.item_rows())
+    except (OSError, ValueError) as e:
+        raise SystemExit(str(e))
+    summary = report.summary()
+    if args.json:
+        json.dump(dict(summary, items=report.item_rows()), sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return
+    print(f"{summary['students']} alumnos, {summary['questions']} preguntas: "
+          f"promedio {summary['mean_pct']}%, mediana {summary['median_pct']}%")
+    for grade, count in summary["grades"].items():
+        print(f"  {grade:<24}{count:>8}")
+    print(f"  {'pregunta':<10}{'dificultad':>12}{'discrim.':>10}{'r pb':>8}{'omitida':>9}  opciones")
+    for item in report.item_rows():
+        pb = "—" if item["point_biserial"] is None else f"{item['point_biserial']:.2f}"
+        print(f"  {item['question']:<10}{item['difficulty']:>12.2f}{item['discrimination']:>10.2f}"
+              f"{pb:>8}{item['omitted']:>9.2f}  {item['options']}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Línea del tiempo de la graficación por computadora (CLI)")
+    parser.add_argument("--catalog", metavar="RUTA",
+                        help=f"catálogo de hitos externo (se compila a {CATALOG_CACHE_DIR}/ la primera vez)")
+    parser.add_argument("--quiz", metavar="RUTA", help="cuestionario externo (JSON)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add_filters(p):
+        p.add_argument("--decade", help="década, p. ej. 1990s")
+        p.add_argument("--tag", help="etiqueta")
+
+    def add_seed(p, required=False):
+        p.add_argument("--seed", type=int, required=required,
+                       help="semilla del cuestionario generado de los hitos")
+        p.add_argument("--length", type=int, default=QUIZ_LENGTH,
+                       help=f"preguntas del cuestionario generado (por omisión {QUIZ_LENGTH})")
+
+    p = sub.add_parser("query", help="busca hitos (del más relevante al menos relevante)")
+    p.add_argument("query", nargs="?", default="", help="texto a buscar (vacío = todos)")
+    add_filters(p)
+    p.add_argument("--limit", type=int, default=20, help="máximo de resultados (0 = todos)")
+    p.add_argument("--json", action="store_true", help="salida en JSON")
+    p.set_defaults(func=cmd_query)
+
+    p = sub.add_parser("facets", help="décadas y etiquetas con su conteo")
+    p.add_argument("--tags", type=int, default=40, help="etiquetas a mostrar (0 = todas)")
+    p.add_argument("--json", action="store_true", help="salida en JSON")
+    p.set_defaults(func=cmd_facets)
+
+    p = sub.add_parser("export", help="exporta los hitos filtrados; el formato sale de la extensión")
+    p.add_argument("path", help="archivo de salida (.csv, .json, .jsonl o .tlc, con .gz/.xz opcional)")
+    p.add_argument("--query", default="", help="texto a buscar")
+    add_filters(p)
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("quiz", help="genera un cuestionario de los hitos (JSON, sirve para --quiz)")
+    add_seed(p, required=True)
+    p.set_defaults(func=cmd_quiz)
+
+    p = sub.add_parser("grade", help="califica respuestas del cuestionario")
+    p.add_argument("answers", help="JSON: lista de respuestas (índices, -1 = sin responder) "
+                                   "o {nombre: lista} para varios intentos")
+    add_seed(p)
+    p.add_argument("--json", action="store_true", help="salida en JSON")
+    p.set_defaults(func=cmd_grade)
+
+    p = sub.add_parser("grade-batch", help="califica un archivo con muchos intentos (requiere NumPy)")
+    p.add_argument("submissions", help="intentos en CSV (alumno,p1,p2,...), JSON o JSON Lines")
+    p.add_argument("--students", metavar="RUTA", help="reporte por alumno (.csv o .json)")
+    p.add_argument("--items", metavar="RUTA", help="estadísticas por pregunta (.csv o .json)")
+    add_seed(p)
+    p.add_argument("--json", action="store_true", help="resumen en JSON")
+    p.set_defaults(func=cmd_grade_batch)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    catalog = load_catalog(args)
+    args.func(catalog, args)
+
+
+if __name__ == "__main__":
+    main()
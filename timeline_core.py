@@ -0,0 +1,1914 @@
+"""
+Núcleo de la línea del tiempo de la graficación por computadora (sin interfaz)
+Descripción:
+ - Datos de los hitos y del cuestionario
+ - Tabla por columnas, facetas, índice trigrama y búsqueda por relevancia (BM25F)
+ - Catálogos externos con caché binaria mapeada en memoria
+ - Exportación e importación (CSV, JSON, JSON Lines, binario por columnas)
+ - Calificación del cuestionario y banco de preguntas generadas con semilla
+ - Instrumentación de tiempos
+
+No importa tkinter, Pillow ni pyttsx3: lo usan la aplicación de escritorio
+(Graficacion29-01-26.py), la línea de comandos (timeline_cli.py) y los
+benchmarks.
+"""
+import bisect
+import csv
+import gzip
+import hashlib
+import heapq
+import itertools
+import json
+import lzma
+import math
+import mmap
+import os
+import random
+import re
+import struct
+import sys
+import threading
+import time
+import unicodedata
+from array import array
+from collections import Counter, OrderedDict, deque
+
+# ---------------------------
+# Datos de la línea del tiempo
+# ---------------------------
+MILESTONES = [
+    (1950, "Pantallas CRT en investigación",
+     "Uso de tubos de rayos catódicos (CRT) en radares y simuladores; base para visualización electrónica.",
+     ["CRT", "visualización", "radares"], "crt.png"),
+    
+    (1957, "Primera imagen digitalizada (Kirsch)",
+     "Russell Kirsch digitaliza una fotografía con la computadora SEAC; inicio de la imagen digital.",
+     ["imagen digital", "SEAC", "Kirsch"], "kirsch.png"),
+    
+    (1963, "Sketchpad (Ivan Sutherland)",
+     "Sistema pionero CAD con lápiz óptico: selección, arrastre, zoom y estructuras jerárquicas de objetos.",
+     ["CAD", "Sketchpad", "interacción"], "sketchpad.png"),
+    
+    (1968, "Mother of All Demos (Engelbart)",
+     "Presentación de NLS: mouse, ventanas, hipervínculos, edición y colaboración; clave para interfaces gráficas.",
+     ["GUI", "NLS", "interfaz"], "nls.png"),
+    
+    (1972, "Pong",
+     "Uno de los primeros videojuegos comerciales; impulso a gráficos interactivos en tiempo real.",
+     ["videojuegos", "Atari"], "pong.png"),
+    
+    (1973, "SuperPaint",
+     "Primeros sistemas con frame buffer en color; edición y pintura digital temprana.",
+     ["raster", "framebuffer"], "superpaint.png"),
+    
+    (1984, "GUI en computadoras personales",
+     "Popularización de entornos gráficos (Macintosh) y posterior adopción masiva (Windows).",
+     ["GUI", "Mac", "Windows"], "gui80s.png"),
+    
+    (1992, "OpenGL",
+     "API estándar multiplataforma para gráficos 2D/3D; cataliza gráficos interactivos y científicos.",
+     ["OpenGL", "API", "3D"], "opengl.png"),
+    
+    (1995, "Toy Story",
+     "Primer largometraje completamente por animación 3D; hito de la industria CGI.",
+     ["cine", "CGI", "Pixar"], "toystory.png"),
+    
+    (1999, "GPUs y sombreadores programables",
+     "Las GPUs dan salto a programabilidad (shaders); rendimiento masivo en gráficos 3D.",
+     ["GPU", "shaders"], "gpu99.png"),
+    
+    (2006, "Programación de shaders consolidada",
+     "Sombreadores de vértice/píxel/geom. ampliamente usados en videojuegos y visualización.",
+     ["shaders", "programable"], "shaders.png"),
+    
+    (2018, "Ray tracing en tiempo real",
+     "Soporte de hardware para trazado de rayos en tiempo real (línea RTX); realismo de iluminación.",
+     ["ray tracing", "RTX"], "rtx.png"),
+    
+    (2020, "VR/AR y altas resoluciones",
+     "Aplicaciones inmersivas, 4K/8K, simulaciones complejas y uso transversal en ciencia, medicina y educación.",
+     ["VR", "AR", "4K/8K"], "vrar.png"),
+]
+
+# ---------------------------
+# Preguntas del cuestionario
+# ---------------------------
+QUIZ = [
+    {
+        "q": "¿Quién desarrolló Sketchpad, considerado pionero del CAD interactivo?",
+        "options": ["Ivan Sutherland", "Douglas Engelbart", "John Whitney", "Alan Kay"],
+        "answer": 0
+    },
+    {
+        "q": "¿Qué hito permitió iluminación más realista en tiempo real a partir de 2018?",
+        "options": ["Mapeado de normales", "Ray tracing con soporte de hardware", "Phong shading", "Wireframe puro"],
+        "answer": 1
+    },
+    {
+        "q": "¿Cuál fue uno de los primeros videojuegos comerciales que impulsó los gráficos interactivos?",
+        "options": ["Spacewar!", "Pong", "Breakout", "Doom"],
+        "answer": 1
+    },
+    {
+        "q": "OpenGL (1992) es principalmente...",
+        "options": ["Un sistema operativo", "Un lenguaje de shading propietario",
+                    "Una API estándar para gráficos", "Un formato de imagen"],
+        "answer": 2
+    },
+    {
+        "q": "La 'Mother of All Demos' (1968) mostró:",
+        "options": ["Pantallas táctiles capacitivas", "Mouse, ventanas e hipervínculos",
+                    "Headsets de VR comerciales", "Smartphones"],
+        "answer": 1
+    },
+    {
+        "q": "Toy Story (1995) es relevante porque:",
+        "options": ["Fue la primera película en 3D estereoscópico",
+                    "Fue el primer largometraje totalmente hecho con animación 3D",
+                    "Usó por primera vez GPUs programables",
+                    "Se dibujó a mano y luego se digitalizó"],
+        "answer": 1
+    },
+    {
+        "q": "Las GPUs programables popularizaron el uso de:",
+        "options": ["Shaders", "Disquetes", "Microfilms", "Tubos de vacío"],
+        "answer": 0
+    },
+    {
+        "q": "SuperPaint aportó tempranamente:",
+        "options": ["Ray tracing en tiempo real", "Render de path tracing",
+                    "Frame buffer en color y pintura digital", "Pantallas OLED"],
+        "answer": 2
+    },
+]
+
+
+def decade_label(year: int) -> str:
+    d = (year // 10) * 10
+    return f"{d}s"
+
+
+class _CombiningMarks(dict):
+    """Tabla para ``str.translate`` que borra las marcas combinantes (acentos).
+
+    Cada carácter se clasifica una sola vez; después la traducción es una
+    consulta al diccionario hecha en C.
+    """
+
+    def __missing__(self, code):
+        value = self[code] = None if unicodedata.combining(chr(code)) else code
+        return value
+
+
+_STRIP_MARKS = _CombiningMarks()
+
+
+def fold_text(text: str) -> str:
+    """Normaliza texto para búsqueda: minúsculas y sin acentos (á → a)"""
+    if text.isascii():
+        return text.lower()
+    return unicodedata.normalize("NFKD", text.casefold()).translate(_STRIP_MARKS)
+
+
+# Fin de frase: ".", "!" o "?" seguido de mayúscula o número, o un ";"
+_SENTENCE_RE = re.compile(r"(?<=[.!?…])\s+(?=[¿¡«\"'(]?[A-ZÁÉÍÓÚÜÑ0-9])|(?<=;)\s+")
+
+
+def split_sentences(text: str):
+    """Divide un texto en frases para narrarlas una por una"""
+    text = " ".join(text.split())
+    return [part for part in _SENTENCE_RE.split(text) if part]
+
+
+# ---------------------------
+# Instrumentación (tiempos de las rutas críticas)
+# ---------------------------
+TRACE_CAPACITY = 5000   # Spans guardados; los más viejos se descartan
+
+
+def _percentile(ordered, p):
+    """Percentil ``p`` (rango más cercano) de una lista ya ordenada"""
+    return ordered[max(0, min(len(ordered) - 1, math.ceil(p / 100 * len(ordered)) - 1))]
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "start")
+
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.record(self.name, self.start)
+        return False
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """Registro opcional de tiempos (spans) en un buffer circular.
+
+    ``with TRACER.span("show_item"):`` mide un bloque; ``record(nombre,
+    inicio)`` registra un tiempo medido a mano (p. ej. entre hilos). Con la
+    instrumentación apagada ``span`` no mide nada. ``summary`` da percentiles
+    por nombre y ``dump`` escribe la traza en el formato de eventos de Chrome
+    (se abre con chrome://tracing o Perfetto).
+    """
+
+    def __init__(self, capacity=TRACE_CAPACITY, enabled=False):
+        self.enabled = enabled
+        self.spans = deque(maxlen=capacity)   # (nombre, inicio, duración, hilo)
+        self.origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def span(self, name):
+        return _Span(self, name) if self.enabled else _NULL_SPAN
+
+    def record(self, name, start, end=None):
+        if not self.enabled:
+            return
+        end = time.perf_counter() if end is None else end
+        with self._lock:
+            self.spans.append((name, start, end - start, threading.get_ident()))
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.spans)
+
+    def clear(self):
+        with self._lock:
+            self.spans.clear()
+
+    def summary(self):
+        """{nombre: {"n", "p50", "p90", "p99", "max"}} con tiempos en ms"""
+        groups = {}
+        for name, _start, duration, _thread in self.snapshot():
+            groups.setdefault(name, []).append(duration * 1000)
+        summary = {}
+        for name in sorted(groups):
+            ordered = sorted(groups[name])
+            summary[name] = {"n": len(ordered),
+                             "p50": round(_percentile(ordered, 50), 3),
+                             "p90": round(_percentile(ordered, 90), 3),
+                             "p99": round(_percentile(ordered, 99), 3),
+                             "max": round(ordered[-1], 3)}
+        return summary
+
+    def dump(self, path):
+        """Guarda los spans (y el resumen) como traza JSON"""
+        pid = os.getpid()
+        events = [{"name": name, "ph": "X", "pid": pid, "tid": thread,
+                   "ts": round((start - self.origin) * 1e6, 1),
+                   "dur": round(duration * 1e6, 1)}
+                  for name, start, duration, thread in self.snapshot()]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms",
+                       "summary": self.summary()}, f, indent=1)
+        return len(events)
+
+
+# Instancia global: la usan la interfaz y los hilos de trabajo
+TRACER = Tracer(enabled=bool(os.environ.get("TIMELINE_TRACE")))
+
+
+# ---------------------------
+# Tabla de hitos (por columnas)
+# ---------------------------
+class MilestoneTable:
+    """Hitos guardados por columnas en lugar de tuplas.
+
+    Los años van en un ``array('i')``; títulos, descripciones, imágenes y
+    etiquetas son cadenas internadas. Cada etiqueta tiene un identificador y
+    las etiquetas de un hito se guardan como un bitset (un entero donde el bit
+    ``k`` indica la etiqueta ``k``). Los filtros trabajan con arreglos de
+    índices sobre la tabla, sin copiar filas.
+    """
+
+    def __init__(self, milestones=()):
+        self.years = array("i")
+        self.titles = []
+        self.descriptions = []
+        self.images = []
+        self.tag_bits = []
+        self.tag_names = []
+        self.tag_ids = {}
+        self.removed = set()   # Hitos quitados (sus identificadores no se reutilizan)
+        for y, title, desc, tags, img in milestones:
+            self.append(y, title, desc, tags, img)
+
+    def __len__(self):
+        return len(self.years)
+
+    def append(self, year, title, desc, tags, img):
+        self.years.append(year)
+        self.titles.append(sys.intern(title))
+        self.descriptions.append(desc)
+        self.images.append(sys.intern(img) if img else "")
+        self.tag_bits.append(self.tag_mask(tags))
+        return len(self.years) - 1
+
+    def set_row(self, i, year, title, desc, tags, img):
+        """Reemplaza los datos del hito ``i`` (conserva su identificador)"""
+        self.years[i] = year
+        self.titles[i] = sys.intern(title)
+        self.descriptions[i] = desc
+        self.images[i] = sys.intern(img) if img else ""
+        self.tag_bits[i] = self.tag_mask(tags)
+
+    def remove(self, i):
+        """Marca el hito ``i`` como quitado; deja de aparecer en ``all_ids``"""
+        self.removed.add(i)
+
+    def tag_mask(self, tags) -> int:
+        bits = 0
+        for tag in tags:
+            bits |= 1 << self.tag_id(tag)
+        return bits
+
+    def tag_id(self, name: str) -> int:
+        """Identificador de la etiqueta (se agrega al vocabulario si es nueva)"""
+        tag_id = self.tag_ids.get(name)
+        if tag_id is None:
+            tag_id = self.tag_ids[name] = len(self.tag_names)
+            self.tag_names.append(sys.intern(name))
+        return tag_id
+
+    def tags(self, i: int):
+        """Etiquetas del hito ``i`` (en el orden del vocabulario)"""
+        bits = self.tag_bits[i]
+        names = []
+        tag_id = 0
+        while bits:
+            if bits & 1:
+                names.append(self.tag_names[tag_id])
+            bits >>= 1
+            tag_id += 1
+        return names
+
+    def row(self, i: int):
+        """Hito ``i`` como tupla (año, título, descripción, etiquetas, imagen)"""
+        return (self.years[i], self.titles[i], self.descriptions[i],
+                self.tags(i), self.images[i])
+
+    def all_ids(self):
+        if self.removed:
+            removed = self.removed
+            return array("I", [i for i in range(len(self.years)) if i not in removed])
+        return array("I", range(len(self.years)))
+
+    @classmethod
+    def from_columns(cls, years, titles, descriptions, images, tag_bits, tag_names):
+        """Tabla que usa directamente las columnas dadas (p. ej. las de un
+        catálogo mapeado en memoria), sin copiarlas"""
+        table = cls()
+        table.years = years
+        table.titles = titles
+        table.descriptions = descriptions
+        table.images = images
+        table.tag_bits = tag_bits
+        for name in tag_names:
+            table.tag_id(name)
+        return table
+
+
+# ---------------------------
+# Facetas (décadas y etiquetas)
+# ---------------------------
+def _bit_ids(bits: int):
+    """Posiciones de los bits encendidos (ids de etiqueta de un bitset)"""
+    tag_id = 0
+    while bits:
+        if bits & 1:
+            yield tag_id
+        bits >>= 1
+        tag_id += 1
+
+
+def _insert_id(ids: array, i: int):
+    """Inserta ``i`` en un arreglo ordenado (al final si es el mayor)"""
+    if not ids or ids[-1] < i:
+        ids.append(i)
+    else:
+        k = bisect.bisect_left(ids, i)
+        if k == len(ids) or ids[k] != i:
+            ids.insert(k, i)
+
+
+def _remove_id(ids: array, i: int) -> bool:
+    """Quita ``i`` de un arreglo ordenado; retorna True si estaba"""
+    k = bisect.bisect_left(ids, i)
+    if k < len(ids) and ids[k] == i:
+        del ids[k]
+        return True
+    return False
+
+
+class MilestoneFacets:
+    """Facetas precalculadas al cargar: década → hitos y etiqueta → hitos.
+
+    Cada faceta guarda su arreglo de índices en orden del catálogo, así que
+    filtrar sólo por década es una consulta al diccionario y los conteos del
+    menú no requieren recorrer los hitos. Las consultas combinadas (década +
+    etiqueta + texto) se resuelven como intersección de conjuntos.
+    """
+
+    def __init__(self, table: MilestoneTable):
+        self.decades = {}     # "1950s" → array('I')
+        self.tags = {}        # id de etiqueta → array('I')
+        self._labels = {}     # 1950 → "1950s"
+        self._sets = {}
+        for i in range(len(table)):
+            self.add(i, table.years[i], table.tag_bits[i])
+
+    def add(self, i, year, tag_bits):
+        label = self._label(year)
+        _insert_id(self.decades.setdefault(label, array("I")), i)
+        self._sets.pop(("decade", label), None)
+        for tag_id in _bit_ids(tag_bits):
+            _insert_id(self.tags.setdefault(tag_id, array("I")), i)
+            self._sets.pop(("tag", tag_id), None)
+
+    def discard(self, i, year, tag_bits):
+        """Quita el hito ``i`` (con el año y etiquetas que tenía) de sus facetas"""
+        for group, key in [(self.decades, self._label(year))] + [(self.tags, t) for t in _bit_ids(tag_bits)]:
+            ids = group.get(key)
+            if ids is not None and _remove_id(ids, i) and not ids:
+                del group[key]
+            self._sets.pop(("decade" if group is self.decades else "tag", key), None)
+
+    def _label(self, year):
+        decade = (year // 10) * 10
+        label = self._labels.get(decade)
+        if label is None:
+            label = self._labels[decade] = decade_label(year)
+        return label
+
+    def decade_counts(self):
+        """Lista de (década, número de hitos) ordenada por década"""
+        return [(label, len(ids)) for label, ids in sorted(self.decades.items())]
+
+    def tag_counts(self, limit=None):
+        """Lista de (id de etiqueta, número de hitos), las más frecuentes primero"""
+        counts = sorted(((tag_id, len(ids)) for tag_id, ids in self.tags.items()),
+                        key=lambda item: (-item[1], item[0]))
+        return counts[:limit] if limit else counts
+
+    def filter(self, ids=None, decade=None, tag=None):
+        """Intersección de ``ids`` con la década y la etiqueta elegidas.
+
+        Retorna None si no hay ningún filtro (es decir, todos los hitos).
+        """
+        groups = []
+        if ids is not None:
+            groups.append((None, ids))
+        if decade is not None:
+            groups.append((("decade", decade), self.decades.get(decade, array("I"))))
+        if tag is not None:
+            groups.append((("tag", tag), self.tags.get(tag, array("I"))))
+        if not groups:
+            return None
+        groups.sort(key=lambda g: len(g[1]))
+        smallest, rest = groups[0][1], groups[1:]
+        if not rest:
+            return smallest
+        sets = [self._as_set(key, group) for key, group in rest]
+        return array("I", [i for i in smallest if all(i in s for s in sets)])
+
+    @classmethod
+    def from_postings(cls, decades, tags):
+        """Facetas con las listas ya calculadas (década → ids, etiqueta → ids)"""
+        facets = cls(MilestoneTable())
+        facets.decades = decades
+        facets.tags = tags
+        for label in decades:
+            facets._labels[int(label[:-1])] = label
+        return facets
+
+    def members(self, decade=None, tag=None):
+        """Conjuntos (en caché) de los hitos de la década y etiqueta elegidas"""
+        sets = []
+        if decade is not None:
+            sets.append(self._as_set(("decade", decade), self.decades.get(decade, array("I"))))
+        if tag is not None:
+            sets.append(self._as_set(("tag", tag), self.tags.get(tag, array("I"))))
+        return sets
+
+    def _as_set(self, key, ids):
+        if key is None:
+            return set(ids)
+        cached = self._sets.get(key)
+        if cached is None:
+            cached = self._sets[key] = frozenset(ids)
+        return cached
+
+
+# ---------------------------
+# Índice de búsqueda
+# ---------------------------
+class MilestoneIndex:
+    """Índice invertido de hitos, construido una sola vez al cargar los datos.
+
+    Guarda el texto de cada hito ya normalizado (año, título, descripción y
+    etiquetas) y un índice trigrama → hitos. Una búsqueda sólo revisa la lista
+    de hitos del trigrama menos frecuente de la consulta, así que su costo es
+    del orden del número de coincidencias y no del tamaño del catálogo.
+    Las consultas de 1-2 caracteres recorren el texto ya normalizado.
+    """
+
+    NGRAM = 3
+
+    def __init__(self, table: MilestoneTable):
+        self.blobs = []
+        self.grams = {}
+        for i in range(len(table)):
+            self.add(table.years[i], table.titles[i], table.descriptions[i], table.tags(i))
+
+    def add(self, year, title, desc, tags):
+        """Agrega un hito al índice y retorna su identificador"""
+        doc_id = len(self.blobs)
+        blob = self._blob(year, title, desc, tags)
+        self.blobs.append(blob)
+        self._post(doc_id, blob)
+        return doc_id
+
+    def update(self, doc_id, year, title, desc, tags):
+        """Reindexa un hito que cambió; sólo se tocan sus trigramas"""
+        blob = self._blob(year, title, desc, tags)
+        old = self.blobs[doc_id]
+        if blob == old:
+            return
+        self._unpost(doc_id, old)
+        self.blobs[doc_id] = blob
+        self._post(doc_id, blob)
+
+    def discard(self, doc_id):
+        """Quita un hito del índice (su identificador queda sin texto)"""
+        self._unpost(doc_id, self.blobs[doc_id])
+        self.blobs[doc_id] = ""
+
+    @staticmethod
+    def _blob(year, title, desc, tags):
+        return fold_text(" ".join([str(year), title, desc, " ".join(tags)]))
+
+    def _trigrams(self, blob):
+        n = self.NGRAM
+        return {blob[i:i + n] for i in range(len(blob) - n + 1)}
+
+    def _post(self, doc_id, blob):
+        for gram in self._trigrams(blob):
+            postings = self.grams.get(gram)
+            if postings is None:
+                postings = self.grams[gram] = array("I")
+            _insert_id(postings, doc_id)
+
+    def _unpost(self, doc_id, blob):
+        for gram in self._trigrams(blob):
+            postings = self.grams.get(gram)
+            if postings is not None and _remove_id(postings, doc_id) and not postings:
+                del self.grams[gram]
+
+    @classmethod
+    def from_postings(cls, blobs, grams):
+        """Índice con el texto normalizado y las listas trigrama → ids ya calculadas"""
+        index = cls(MilestoneTable())
+        index.blobs = blobs
+        index.grams = grams
+        return index
+
+    def search(self, query: str, candidates=None):
+        """Arreglo de identificadores (en orden del catálogo) que contienen la consulta.
+
+        Si se pasa ``candidates`` (identificadores en orden ascendente que ya
+        contienen a todas las coincidencias), sólo se revisan esos.
+        """
+        q = fold_text(query.strip())
+        if not q:
+            return array("I", range(len(self.blobs)) if candidates is None else candidates)
+        n = self.NGRAM
+        if len(q) >= n:
+            for i in range(len(q) - n + 1):
+                postings = self.grams.get(q[i:i + n])
+                if postings is None:
+                    return array("I")
+                if candidates is None or len(postings) < len(candidates):
+                    candidates = postings
+        elif candidates is None:
+            candidates = range(len(self.blobs))
+        blobs = self.blobs
+        return array("I", [i for i in candidates if q in blobs[i]])
+
+
+class IncrementalSearch:
+    """Búsqueda incremental con caché de resultados por prefijo.
+
+    Al escribir un carácter más, el resultado nuevo es un subconjunto del de
+    cualquier prefijo ya consultado, así que sólo se filtra ese resultado.
+    Al borrar (backspace) el prefijo más corto ya está en la caché.
+    """
+
+    MAX_CACHED = 64
+
+    def __init__(self, index: MilestoneIndex):
+        self.index = index
+        self.cache = OrderedDict()
+
+    def search(self, query: str):
+        q = fold_text(query.strip())
+        ids = self.cache.get(q)
+        if ids is not None:
+            self.cache.move_to_end(q)
+            return ids
+
+        ids = self.index.search(q, self._prefix_result(q))
+        self.cache[q] = ids
+        if len(self.cache) > self.MAX_CACHED:
+            self.cache.popitem(last=False)
+        return ids
+
+    def _prefix_result(self, q: str):
+        """Resultado del prefijo más largo de ``q`` que esté en la caché"""
+        for k in range(len(q) - 1, 0, -1):
+            ids = self.cache.get(q[:k])
+            if ids is not None:
+                return ids
+        return None
+
+    def clear(self):
+        self.cache.clear()
+
+
+# ---------------------------
+# Búsqueda por relevancia (BM25F)
+# ---------------------------
+RANK_BOOSTS = (3.0, 2.0, 1.0)   # Peso de título (con el año), etiquetas y descripción
+BM25_K1 = 1.2
+BM25_B = 0.75
+RANK_LIMIT = 500                # Coincidencias que se ordenan por relevancia (las demás van después)
+PREFIX_EXPANSION = 32           # Términos que completa la última palabra de la consulta
+COMPLETE_MIN_CHARS = 3          # Letras mínimas de la última palabra para completarla
+RANK_SCORE_CACHE = 256          # Términos con sus puntuaciones ya calculadas (LRU)
+STOPWORDS = frozenset("""
+a al con de del e el en la las lo los o para por que se su sus un una uno y
+""".split())
+FUZZY_WEIGHT = 0.6             # Factor de puntuación por cada error corregido
+FUZZY_EXPANSION = 8            # Correcciones que se prueban por palabra
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text: str):
+    """Palabras de ``text`` sin acentos ni mayúsculas, sin palabras vacías"""
+    return [t for t in _TOKEN_RE.findall(fold_text(text)) if t not in STOPWORDS]
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Distancia de Levenshtein entre ``a`` y ``b``, o ``limit + 1`` si la supera.
+
+    Sólo se calcula la franja de ancho ``2·limit + 1`` alrededor de la
+    diagonal y se corta en cuanto una fila entera pasa del límite.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if len(a) > len(b):
+        a, b = b, a
+    big = limit + 1
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        lo = max(1, i - limit)
+        hi = min(len(b), i + limit)
+        cur = [big] * (len(b) + 1)
+        cur[0] = i if i <= limit else big
+        for j in range(lo, hi + 1):
+            cost = 0 if ca == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+        if min(cur[lo - 1:hi + 1]) > limit:
+            return big
+        prev = cur
+    return min(prev[len(b)], big)
+
+
+class FuzzyIndex:
+    """Índice trigrama de palabras para tolerar errores de escritura.
+
+    Cada palabra (con marcas de inicio y fin, ``^skechpad$``) se parte en
+    trigramas. Un error de edición cambia a lo más tres trigramas, así que una
+    palabra a distancia ``k`` comparte al menos ``trigramas − 3k`` con la
+    consulta; sólo las que pasan ese filtro se comparan con
+    ``edit_distance``, en lugar de comparar contra todo el vocabulario.
+    """
+
+    def __init__(self, words=()):
+        self.words = []
+        self.ids = {}
+        self.grams = {}   # trigrama → array('I') de palabras
+        for word in words:
+            self.add(word)
+
+    @staticmethod
+    def _grams(word):
+        padded = f"^{word}$"
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    @staticmethod
+    def max_edits(word) -> int:
+        """Errores tolerados según el largo: ninguno en palabras muy cortas"""
+        if len(word) < 4:
+            return 0
+        return 1 if len(word) < 8 else 2
+
+    def add(self, word):
+        if word in self.ids:
+            return
+        word_id = self.ids[word] = len(self.words)
+        self.words.append(word)
+        for gram in self._grams(word):
+            self.grams.setdefault(gram, array("I")).append(word_id)
+
+    def lookup(self, word, limit=FUZZY_EXPANSION):
+        """Palabras parecidas a ``word``: lista de (distancia, palabra), las más cercanas primero"""
+        k = self.max_edits(word)
+        if not k:
+            return []
+        grams = self._grams(word)
+        shared = Counter()
+        for gram in grams:
+            ids = self.grams.get(gram)
+            if ids:
+                shared.update(ids)
+        need = len(grams) - 3 * k
+        matches = []
+        for word_id, n in shared.items():
+            if n < need:
+                continue
+            candidate = self.words[word_id]
+            d = edit_distance(word, candidate, k)
+            if d <= k:
+                matches.append((d, candidate))
+        return heapq.nsmallest(limit, matches)
+
+
+class RankedIndex:
+    """Índice invertido por palabra para ordenar resultados por relevancia.
+
+    Cada término guarda los hitos que lo contienen (en orden del catálogo) y
+    cuántas veces aparece en el título, las etiquetas y la descripción. La
+    puntuación es BM25F: las frecuencias de cada campo se normalizan por su
+    longitud, se ponderan con ``RANK_BOOSTS`` y se saturan con ``BM25_K1``.
+    ``order`` puntúa sólo las coincidencias de la búsqueda por texto y pone
+    primero las ``limit`` mejores (elegidas con un heap, sin ordenar todo el
+    resultado). ``search`` busca por palabras y corrige las que no están en el
+    índice con un ``FuzzyIndex`` de las palabras de títulos y etiquetas.
+    """
+
+    FIELDS = 3
+
+    def __init__(self, table: MilestoneTable = None):
+        self.docs = {}              # término → array('I') de hitos
+        self.freqs = {}             # término → array('H'), FIELDS frecuencias por hito
+        self.lengths = array("H")   # FIELDS longitudes por hito
+        self.totals = [0] * self.FIELDS
+        self.count = 0              # Hitos indexados
+        self.heads = {}             # Palabra de título/etiquetas → hitos que la usan
+        self._vocab = None          # Términos ordenados (para completar prefijos)
+        self._fuzzy = None          # FuzzyIndex de ``heads`` (se arma al primer uso)
+        self._score_cache = OrderedDict()   # término → puntuación de cada hito de su lista
+        if table is not None:
+            for i in table.all_ids():
+                self.add(i, *table.row(i)[:4])
+
+    @classmethod
+    def from_postings(cls, docs, freqs, lengths, totals, count, heads):
+        index = cls()
+        index.docs = docs
+        index.freqs = freqs
+        index.lengths = lengths
+        index.totals = list(totals)
+        index.count = count
+        index.heads = heads
+        return index
+
+    @staticmethod
+    def _head_terms(fields):
+        """Palabras de título y etiquetas que entran al índice difuso (sin años)"""
+        return {term for term in itertools.chain(fields[0], fields[1]) if not term.isdigit()}
+
+    def _fields(self, year, title, desc, tags):
+        return (tokenize(f"{title} {year}"), tokenize(" ".join(tags)), tokenize(desc))
+
+    def add(self, doc_id, year, title, desc, tags):
+        """Indexa el hito ``doc_id`` (nuevo, o antes quitado con ``discard``)"""
+        if self._score_cache:
+            self._score_cache.clear()   # Cambian las longitudes promedio y los idf
+        fields = self._fields(year, title, desc, tags)
+        per_term = {}
+        for f, tokens in enumerate(fields):
+            for term, n in Counter(tokens).items():
+                per_term.setdefault(term, [0] * self.FIELDS)[f] = min(n, 0xFFFF)
+        lengths = [min(len(tokens), 0xFFFF) for tokens in fields]
+        start = doc_id * self.FIELDS
+        if start >= len(self.lengths):
+            self.lengths.extend([0] * (start + self.FIELDS - len(self.lengths)))
+        self.lengths[start:start + self.FIELDS] = array("H", lengths)
+        for f, n in enumerate(lengths):
+            self.totals[f] += n
+        self.count += 1
+        for term in self._head_terms(fields):
+            count = self.heads.get(term, 0)
+            self.heads[term] = count + 1
+            if not count and self._fuzzy is not None:
+                self._fuzzy.add(term)
+        for term, tf in per_term.items():
+            docs = self.docs.get(term)
+            if docs is None:
+                docs = self.docs[term] = array("I")
+                self.freqs[term] = array("H")
+                self._vocab = None
+            if not docs or docs[-1] < doc_id:
+                docs.append(doc_id)
+                self.freqs[term].extend(tf)
+            else:
+                k = bisect.bisect_left(docs, doc_id)
+                docs.insert(k, doc_id)
+                self.freqs[term][k * self.FIELDS:k * self.FIELDS] = array("H", tf)
+
+    def discard(self, doc_id, year, title, desc, tags):
+        """Quita el hito ``doc_id``, indexado con los datos dados"""
+        if self._score_cache:
+            self._score_cache.clear()
+        fields = self._fields(year, title, desc, tags)
+        for term in self._head_terms(fields):
+            count = self.heads.get(term, 0) - 1
+            if count > 0:
+                self.heads[term] = count
+            else:
+                # Se queda en el índice difuso; sin hitos, ya no suma puntos
+                self.heads.pop(term, None)
+        for term in set(itertools.chain.from_iterable(fields)):
+            docs = self.docs.get(term)
+            if docs is None:
+                continue
+            k = bisect.bisect_left(docs, doc_id)
+            if k < len(docs) and docs[k] == doc_id:
+                del docs[k]
+                del self.freqs[term][k * self.FIELDS:(k + 1) * self.FIELDS]
+                if not docs:
+                    del self.docs[term]
+                    del self.freqs[term]
+                    self._vocab = None
+        start = doc_id * self.FIELDS
+        for f in range(self.FIELDS):
+            self.totals[f] -= self.lengths[start + f]
+            self.lengths[start + f] = 0
+        self.count -= 1
+
+    def update(self, doc_id, old_row, new_row):
+        self.discard(doc_id, *old_row[:4])
+        self.add(doc_id, *new_row[:4])
+
+    def expand(self, query: str, fuzzy=True):
+        """Términos a buscar por cada palabra de ``query``: lista de {término: peso}.
+
+        La última palabra también se completa (si la consulta no termina en
+        espacio y tiene al menos ``COMPLETE_MIN_CHARS`` letras), para buscar
+        mientras se escribe. Con ``fuzzy``, las palabras que no están en el
+        índice se corrigen con el índice difuso, con peso ``FUZZY_WEIGHT``
+        elevado al número de errores.
+        """
+        words = tokenize(query)
+        expanded = []
+        complete_last = not query[-1:].isspace()
+        for pos, word in enumerate(words):
+            weights = {}
+            if word in self.docs:
+                weights[word] = 1.0
+            if complete_last and pos == len(words) - 1 and len(word) >= COMPLETE_MIN_CHARS:
+                for term in self.completions(word):
+                    weights.setdefault(term, 1.0)
+            if not weights and fuzzy:
+                for errors, term in self.fuzzy.lookup(word):
+                    weights[term] = max(weights.get(term, 0.0), FUZZY_WEIGHT ** errors)
+            expanded.append(weights)
+        return expanded
+
+    def completions(self, prefix: str):
+        """Hasta ``PREFIX_EXPANSION`` términos que empiezan con ``prefix`` (sin él)"""
+        if self._vocab is None:
+            self._vocab = sorted(self.docs)
+        vocab = self._vocab
+        k = bisect.bisect_left(vocab, prefix)
+        completions = []
+        while k < len(vocab) and vocab[k].startswith(prefix) and len(completions) < PREFIX_EXPANSION:
+            if vocab[k] != prefix:
+                completions.append(vocab[k])
+            k += 1
+        return completions
+
+    @property
+    def fuzzy(self) -> FuzzyIndex:
+        if self._fuzzy is None:
+            self._fuzzy = FuzzyIndex(self.heads)
+        return self._fuzzy
+
+    def _term_scores(self, term):
+        """Puntuación BM25F (sin el peso de la consulta) de cada hito de la
+        lista de ``term``, en el mismo orden; se guarda en una caché LRU"""
+        cached = self._score_cache.get(term)
+        if cached is not None:
+            self._score_cache.move_to_end(term)
+            return cached
+        n = self.count
+        norms = [(1 - BM25_B, BM25_B / max(total / n, 1e-9)) for total in self.totals]
+        lengths = self.lengths
+        fields = range(self.FIELDS)
+        boosts = RANK_BOOSTS
+        k1 = BM25_K1
+        docs = self.docs[term]
+        freqs = self.freqs[term]
+        df = len(docs)
+        idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+        cached = array("d", bytes(8 * df))
+        for k, d in enumerate(docs):
+            base = d * self.FIELDS
+            off = k * self.FIELDS
+            tf = 0.0
+            for f in fields:
+                count = freqs[off + f]
+                if count:
+                    a, b = norms[f]
+                    tf += boosts[f] * count / (a + b * lengths[base + f])
+            cached[k] = idf * tf * (k1 + 1) / (tf + k1)
+        self._score_cache[term] = cached
+        if len(self._score_cache) > RANK_SCORE_CACHE:
+            self._score_cache.popitem(last=False)
+        return cached
+
+    def _scores(self, terms, candidates=None):
+        """Puntuación de cada hito para ``terms`` ({término: peso}).
+
+        Con ``candidates`` (arreglo ordenado) sólo se puntúan esos hitos: si
+        son pocos frente a las listas de los términos, cada uno se busca con
+        bisección en las listas; si no, se recorren las listas saltando los
+        que no son candidatos.
+        """
+        terms = [(term, weight) for term, weight in terms.items() if term in self.docs]
+        if not terms:
+            return {}
+        by_doc = (candidates is not None
+                  and len(candidates) * len(terms) < sum(len(self.docs[t]) for t, _w in terms))
+        members = set(candidates) if candidates is not None and not by_doc else None
+        scores = {}
+        for term, weight in terms:
+            docs = self.docs[term]
+            term_scores = self._term_scores(term)
+            if by_doc:
+                df = len(docs)
+                pairs = []
+                for d in candidates:
+                    k = bisect.bisect_left(docs, d)
+                    if k < df and docs[k] == d:
+                        pairs.append((d, term_scores[k]))
+            elif members is not None:
+                pairs = [(d, score) for d, score in zip(docs, term_scores) if d in members]
+            else:
+                pairs = zip(docs, term_scores)
+            if not scores:
+                scores = {d: weight * score for d, score in pairs}
+                continue
+            get = scores.get
+            for d, score in pairs:
+                scores[d] = get(d, 0.0) + weight * score
+        return scores
+
+    @staticmethod
+    def _best(scores, limit):
+        """Hitos de ``scores`` del mejor al peor (a lo más ``limit``); los empates
+        conservan el orden de ``scores``"""
+        if limit is None or limit >= len(scores):
+            return sorted(scores, key=scores.__getitem__, reverse=True)
+        return heapq.nlargest(limit, scores, key=scores.__getitem__)
+
+    def order(self, query: str, ids, limit=RANK_LIMIT):
+        """Las coincidencias ``ids`` (en orden del catálogo) con las ``limit``
+        más relevantes primero y las demás después, en su orden original"""
+        if not self.count or len(ids) < 2:
+            return ids
+        terms = {}
+        for weights in self.expand(query, fuzzy=False):
+            for term, weight in weights.items():
+                terms[term] = max(terms.get(term, 0.0), weight)
+        scores = self._scores(terms, ids)
+        if not scores:
+            return ids
+        best = self._best(scores, limit)
+        if len(best) == len(ids):
+            return array("I", best)
+        chosen = set(best)
+        return array("I", best + [i for i in ids if i not in chosen])
+
+    def search(self, query: str, require=(), limit=None):
+        """Hitos que contienen cada palabra de ``query`` (exacta, completada o
+        corregida), del más relevante al menos relevante.
+
+        ``require`` son conjuntos (p. ej. de una década o etiqueta) a los que
+        debe pertenecer cada resultado; ``limit`` corta la lista.
+        """
+        if not self.count:
+            return array("I")
+        matched = None
+        scores = {}
+        for weights in self.expand(query):
+            word_scores = self._scores(weights)
+            docs = set(word_scores) if matched is None else matched.intersection(word_scores)
+            matched = {d for d in docs if all(d in s for s in require)} if require else docs
+            if not matched:
+                return array("I")
+            for d, score in word_scores.items():
+                scores[d] = scores.get(d, 0.0) + score
+        if not matched:
+            return array("I")
+        return array("I", self._best({d: scores[d] for d in matched}, limit))
+
+
+# ---------------------------
+# Exportación e importación
+# ---------------------------
+EXPORT_CHUNK = 2000            # Filas por bloque de escritura (y por aviso de avance)
+EXPORT_BUFFER = 1024 * 1024    # Búfer de escritura del archivo
+
+
+def export_record(table: MilestoneTable, i: int) -> dict:
+    return {"year": table.years[i], "title": table.titles[i],
+            "description": table.descriptions[i], "tags": table.tags(i)}
+
+
+def write_csv(f, table: MilestoneTable, ids, on_chunk=None) -> bool:
+    """Escribe los hitos ``ids`` como CSV, por bloques.
+
+    ``on_chunk(filas_escritas)`` se llama tras cada bloque; si retorna False
+    la escritura se cancela y se retorna False.
+    """
+    w = csv.writer(f)
+    w.writerow(["year", "title", "description", "tags"])
+    t = table
+    for start in range(0, len(ids), EXPORT_CHUNK):
+        block = ids[start:start + EXPORT_CHUNK]
+        w.writerows([t.years[i], t.titles[i], t.descriptions[i], ";".join(t.tags(i))]
+                    for i in block)
+        if on_chunk and on_chunk(start + len(block)) is False:
+            return False
+    return True
+
+
+class JSONArrayWriter:
+    """Escribe un arreglo JSON elemento por elemento, sin armarlo en memoria.
+
+    El resultado es idéntico a ``json.dump(lista, f, ensure_ascii=False, indent=2)``.
+    """
+
+    def __init__(self, f, indent=2):
+        self.f = f
+        self.pad = " " * indent
+        self.indent = indent
+        self.count = 0
+
+    def write(self, obj):
+        text = json.dumps(obj, ensure_ascii=False, indent=self.indent)
+        self.f.write(("[\n" if self.count == 0 else ",\n") + self.pad + text.replace("\n", "\n" + self.pad))
+        self.count += 1
+
+    def close(self):
+        self.f.write("\n]" if self.count else "[]")
+
+
+def write_json(f, table: MilestoneTable, ids, on_chunk=None) -> bool:
+    """Escribe los hitos ``ids`` como arreglo JSON, por bloques (ver ``write_csv``)"""
+    out = JSONArrayWriter(f)
+    for start in range(0, len(ids), EXPORT_CHUNK):
+        block = ids[start:start + EXPORT_CHUNK]
+        for i in block:
+            out.write(export_record(table, i))
+        if on_chunk and on_chunk(start + len(block)) is False:
+            return False
+    out.close()
+    return True
+
+
+def write_jsonl(f, table: MilestoneTable, ids, on_chunk=None) -> bool:
+    """Escribe los hitos ``ids`` como JSON Lines (un objeto por línea)"""
+    dumps = json.JSONEncoder(ensure_ascii=False).encode
+    for start in range(0, len(ids), EXPORT_CHUNK):
+        block = ids[start:start + EXPORT_CHUNK]
+        f.write("".join(dumps(export_record(table, i)) + "\n" for i in block))
+        if on_chunk and on_chunk(start + len(block)) is False:
+            return False
+    return True
+
+
+# Formato binario por columnas (.tlc). Todo en little-endian:
+#   cabecera: MAGIC, versión (u16), etiquetas (columna de cadenas)
+#   bloques de hasta EXPORT_CHUNK filas: filas (u32), años (i32 × n),
+#   etiquetas (bitset de ancho fijo × n), y las columnas de cadenas de
+#   título, descripción e imagen; un bloque de 0 filas cierra el archivo.
+#   Una columna de cadenas es: longitudes en caracteres (u32 × n),
+#   bytes (u32) y el texto UTF-8 concatenado.
+COLUMNAR_MAGIC = b"TLCB"
+COLUMNAR_VERSION = 1
+_U32 = struct.Struct("<I")
+
+
+def _le_bytes(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _le_array(typecode: str, data: bytes) -> array:
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def _write_strings(f, strings):
+    text = "".join(strings)
+    data = text.encode("utf-8")
+    f.write(_le_bytes(array("I", map(len, strings))))
+    f.write(_U32.pack(len(data)))
+    f.write(data)
+
+
+def _read_exact(f, size: int) -> bytes:
+    data = f.read(size)
+    if len(data) != size:
+        raise ValueError("Archivo binario truncado")
+    return data
+
+
+def _read_strings(f, count: int):
+    lengths = _le_array("I", _read_exact(f, 4 * count))
+    text = _read_exact(f, _U32.unpack(_read_exact(f, 4))[0]).decode("utf-8")
+    strings = []
+    pos = 0
+    for n in lengths:
+        strings.append(text[pos:pos + n])
+        pos += n
+    return strings
+
+
+def write_columnar(f, table: MilestoneTable, ids, on_chunk=None) -> bool:
+    """Escribe los hitos ``ids`` en el formato binario por columnas (``f`` binario)"""
+    t = table
+    width = (len(t.tag_names) + 7) // 8
+    f.write(COLUMNAR_MAGIC + struct.pack("<H", COLUMNAR_VERSION))
+    f.write(_U32.pack(len(t.tag_names)))
+    _write_strings(f, t.tag_names)
+    for start in range(0, len(ids), EXPORT_CHUNK):
+        block = ids[start:start + EXPORT_CHUNK]
+        f.write(_U32.pack(len(block)))
+        f.write(_le_bytes(array("i", (t.years[i] for i in block))))
+        f.write(b"".join(t.tag_bits[i].to_bytes(width, "little") for i in block))
+        _write_strings(f, [t.titles[i] for i in block])
+        _write_strings(f, [t.descriptions[i] for i in block])
+        _write_strings(f, [t.images[i] for i in block])
+        if on_chunk and on_chunk(start + len(block)) is False:
+            return False
+    f.write(_U32.pack(0))
+    return True
+
+
+def read_columnar(f) -> MilestoneTable:
+    """Carga una tabla escrita con ``write_columnar`` (``f`` binario).
+
+    Las columnas se leen en bloque y se agregan directo a la tabla, sin
+    pasar por ``MilestoneTable.append`` fila por fila.
+    """
+    if _read_exact(f, 4) != COLUMNAR_MAGIC:
+        raise ValueError("No es un archivo binario de la línea del tiempo")
+    version, = struct.unpack("<H", _read_exact(f, 2))
+    if version != COLUMNAR_VERSION:
+        raise ValueError(f"Versión de formato no soportada: {version}")
+    table = MilestoneTable()
+    for name in _read_strings(f, _U32.unpack(_read_exact(f, 4))[0]):
+        table.tag_id(name)
+    width = (len(table.tag_names) + 7) // 8
+    from_bytes = int.from_bytes
+    while True:
+        count, = _U32.unpack(_read_exact(f, 4))
+        if count == 0:
+            return table
+        table.years.extend(_le_array("i", _read_exact(f, 4 * count)))
+        if width:
+            bits = _read_exact(f, width * count)
+            table.tag_bits.extend(from_bytes(bits[k:k + width], "little")
+                                  for k in range(0, width * count, width))
+        else:
+            # Sin etiquetas el archivo no trae bits
+            table.tag_bits.extend([0] * count)
+        table.titles.extend(map(sys.intern, _read_strings(f, count)))
+        table.descriptions.extend(_read_strings(f, count))
+        table.images.extend(map(sys.intern, _read_strings(f, count)))
+
+
+def _records_table(records) -> MilestoneTable:
+    """Tabla con los hitos ``records`` (diccionarios); ValueError si alguno no es válido"""
+    table = MilestoneTable()
+    for n, r in enumerate(records, 1):
+        try:
+            tags = r.get("tags") or []
+            if isinstance(tags, str):
+                tags = [tag for tag in tags.split(";") if tag]
+            # Una fila CSV corta o un JSON con null deja campos en None
+            title, desc, image = r["title"], r.get("description") or "", r.get("image") or ""
+            fields = [("title", title), ("description", desc), ("image", image)]
+            for name, value in fields + [("tags", tag) for tag in tags]:
+                if not isinstance(value, str):
+                    raise TypeError(f"{name} debe ser texto, no {value!r}")
+            table.append(int(r["year"]), title, desc, tags, image)
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"hito {n} no válido ({type(e).__name__}: {e})") from None
+    return table
+
+
+# Formatos por extensión (después de quitar .gz/.xz): (escritor, binario)
+EXPORT_FORMATS = {
+    ".csv": (write_csv, False),
+    ".json": (write_json, False),
+    ".jsonl": (write_jsonl, False),
+    ".tlc": (write_columnar, True),
+}
+COMPRESSORS = {".gz": gzip.open, ".xz": lzma.open}
+
+
+def split_export_path(path):
+    """Retorna (formato, compresión) según las extensiones de ``path``.
+
+    ``"linea.jsonl.gz"`` → ``(".jsonl", ".gz")``; sin compresión el segundo
+    valor es ``None``.
+    """
+    root, ext = os.path.splitext(path.lower())
+    compression = None
+    if ext in COMPRESSORS:
+        compression = ext
+        root, ext = os.path.splitext(root)
+    return ext, compression
+
+
+def open_export(path, mode="r", compression=None, binary=False):
+    """Abre ``path`` para exportar o importar, comprimido con gzip/lzma si se pide"""
+    if compression:
+        opener = COMPRESSORS[compression]
+        if binary:
+            return opener(path, mode + "b")
+        return opener(path, mode + "t", encoding="utf-8", newline="")
+    if binary:
+        return open(path, mode + "b", buffering=EXPORT_BUFFER)
+    return open(path, mode, encoding="utf-8", newline="", buffering=EXPORT_BUFFER)
+
+
+def load_export(path) -> MilestoneTable:
+    """Vuelve a cargar una exportación (CSV, JSON, JSON Lines o binaria,
+    comprimida o no), según la extensión de ``path``"""
+    ext, compression = split_export_path(path)
+    if ext not in EXPORT_FORMATS:
+        raise ValueError(f"Formato no reconocido: {path}")
+    with open_export(path, "r", compression, binary=EXPORT_FORMATS[ext][1]) as f:
+        if ext == ".tlc":
+            return read_columnar(f)
+        if ext == ".csv":
+            return _records_table(csv.DictReader(f))
+        if ext == ".jsonl":
+            return _records_table(json.loads(line) for line in f if line.strip())
+        return _records_table(json.load(f))
+
+
+# ---------------------------
+# Catálogos externos (con caché binaria mapeada en memoria)
+# ---------------------------
+CATALOG_CACHE_DIR = ".catalogcache"
+CATALOG_CACHE_MAGIC = b"TLCM"
+CATALOG_CACHE_VERSION = 4
+_TRAILER = struct.Struct("=Q4s")
+
+
+class MappedColumn:
+    """Columna de solo lectura sobre un búfer mapeado, con cambios encima.
+
+    ``get(i)`` lee la fila ``i`` del búfer cuando se pide. Las filas
+    reemplazadas y las agregadas se guardan aparte en memoria, así que la
+    columna se comporta como una lista sin copiar el archivo.
+    """
+
+    def __init__(self, count, get):
+        self._count = count
+        self._get = get
+        self._changed = {}
+        self._extra = []
+
+    def __len__(self):
+        return self._count + len(self._extra)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if i >= self._count:
+            return self._extra[i - self._count]
+        if self._changed and i in self._changed:
+            return self._changed[i]
+        if i < 0:
+            raise IndexError(i)
+        return self._get(i)
+
+    def __setitem__(self, i, value):
+        if i < 0:
+            i += len(self)
+        if i >= self._count:
+            self._extra[i - self._count] = value
+        else:
+            self._changed[i] = value
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def append(self, value):
+        self._extra.append(value)
+
+
+class MappedPostings(dict):
+    """Diccionario clave → ``array('I')`` cuyas listas viven en un búfer mapeado.
+
+    Cada lista se copia a un ``array`` (una copia de memoria, sin convertir
+    valores) la primera vez que se pide; desde ahí es un arreglo normal que se
+    puede modificar.
+    """
+
+    def __init__(self, data, spans, typecode="I"):
+        super().__init__()
+        self._data = data          # bytes de todas las listas (valores nativos)
+        self._spans = spans        # clave → (inicio, fin) en número de valores
+        self._typecode = typecode
+
+    def __missing__(self, key):
+        start, end = self._spans.pop(key)
+        ids = array(self._typecode)
+        ids.frombytes(self._data[ids.itemsize * start:ids.itemsize * end])
+        self[key] = ids
+        return ids
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def setdefault(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            self[key] = default
+            return default
+
+    def __contains__(self, key):
+        return dict.__contains__(self, key) or key in self._spans
+
+    def __len__(self):
+        return dict.__len__(self) + len(self._spans)
+
+    def __iter__(self):
+        yield from list(dict.keys(self))
+        yield from list(self._spans)
+
+    def keys(self):
+        return list(self)
+
+    def items(self):
+        return [(key, self[key]) for key in self]
+
+    def values(self):
+        return [self[key] for key in self]
+
+
+class _CacheWriter:
+    """Escribe secciones alineadas y anota su posición en el directorio"""
+
+    def __init__(self, f):
+        self.f = f
+        self.sections = {}
+
+    def _align(self):
+        pad = -self.f.tell() % 8
+        if pad:
+            self.f.write(b"\0" * pad)
+
+    def raw(self, name, data):
+        self._align()
+        self.sections[name] = [self.f.tell(), len(data)]
+        self.f.write(data)
+
+    def strings(self, name, strings):
+        """Textos UTF-8 concatenados más sus desplazamientos (u64, n + 1)"""
+        offsets = array("Q", [0])
+        self._align()
+        start = self.f.tell()
+        pos = 0
+        for block in range(0, len(strings), EXPORT_CHUNK):
+            parts = [strings[k].encode("utf-8")
+                     for k in range(block, min(block + EXPORT_CHUNK, len(strings)))]
+            for part in parts:
+                pos += len(part)
+                offsets.append(pos)
+            self.f.write(b"".join(parts))
+        self.sections[name] = [start, self.f.tell() - start]
+        self.raw(name + ".offsets", offsets.tobytes())
+
+    def postings(self, name, mapping, keys=None, typecode="I"):
+        """Listas de ids concatenadas; retorna {clave: (inicio, fin)}"""
+        spans = {}
+        self._align()
+        start = self.f.tell()
+        pos = 0
+        for key in (mapping if keys is None else keys):
+            ids = mapping[key]
+            self.f.write(array(typecode, ids).tobytes())
+            spans[key] = (pos, pos + len(ids))
+            pos += len(ids)
+        self.sections[name] = [start, self.f.tell() - start]
+        return spans
+
+
+def _load_quiz(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class Catalog:
+    """Hitos y cuestionario de la aplicación, con su índice y facetas.
+
+    ``Catalog.builtin()`` usa ``MILESTONES`` y ``QUIZ``; ``Catalog.load(ruta)``
+    lee un catálogo externo (CSV, JSON, JSON Lines o binario, ver
+    ``load_export``). La primera carga de un catálogo externo lo compila a un
+    archivo binario en ``CATALOG_CACHE_DIR`` con las columnas de la tabla, las
+    facetas y el índice de búsqueda; las siguientes lo mapean en memoria con
+    ``mmap`` en lugar de volver a leerlo, así que el arranque no depende del
+    número de hitos.
+    """
+
+    def __init__(self, table, quiz, facets=None, index=None, ranker=None, source=None, quiz_path=None):
+        self.table = table
+        self.set_quiz(quiz)
+        self.facets = facets if facets is not None else MilestoneFacets(table)
+        self.index = index if index is not None else MilestoneIndex(table)
+        self.ranker = ranker if ranker is not None else RankedIndex(table)
+        self.source = source
+        self.quiz_path = quiz_path
+        self.lock = threading.Lock()   # Protege índice y facetas al recargar
+        self._mmap = None
+        self._bank = None
+
+    def set_quiz(self, quiz):
+        """Cambia el cuestionario; ``None`` = ``QUIZ`` (``quiz_is_external`` lo distingue)"""
+        self.quiz_is_external = quiz is not None
+        self.quiz = quiz if quiz is not None else QUIZ
+
+    @classmethod
+    def builtin(cls, quiz_path=None):
+        return cls(MilestoneTable(MILESTONES), _load_quiz(quiz_path) if quiz_path else None)
+
+    @classmethod
+    def load(cls, path, quiz_path=None, cache_dir=CATALOG_CACHE_DIR):
+        """Carga el catálogo ``path`` desde su caché, compilándola si hace falta.
+
+        Un catálogo JSON puede ser una lista de hitos o un objeto
+        ``{"milestones": [...], "quiz": [...]}``; si no trae cuestionario se
+        usa ``quiz_path`` (JSON) o ``QUIZ``.
+        """
+        cache_path = cls.cache_path(path, quiz_path, cache_dir)
+        if os.path.exists(cache_path):
+            try:
+                return cls.open_cache(cache_path, source=path, quiz_path=quiz_path)
+            except (OSError, ValueError) as e:
+                print(f"Caché de catálogo inválida, se reconstruye: {e}")
+        catalog = cls.parse(path, quiz_path)
+        try:
+            catalog.save_cache(cache_path)
+        except OSError as e:
+            print(f"No se pudo guardar la caché del catálogo: {e}")
+        return catalog
+
+    @classmethod
+    def parse(cls, path, quiz_path=None):
+        """Lee el catálogo ``path`` sin usar la caché"""
+        table, quiz = cls.read(path, quiz_path)
+        return cls(table, quiz, source=path, quiz_path=quiz_path)
+
+    @staticmethod
+    def read(path, quiz_path=None):
+        """Lee sólo la tabla y el cuestionario de ``path`` (sin índice ni facetas).
+
+        El cuestionario es ``None`` si ni el catálogo ni ``quiz_path`` traen uno.
+        """
+        quiz = None
+        ext, compression = split_export_path(path)
+        if ext == ".json":
+            with open_export(path, "r", compression) as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                quiz = data.get("quiz")
+                data = data.get("milestones", [])
+            table = _records_table(data)
+        else:
+            table = load_export(path)
+        if quiz is None and quiz_path:
+            quiz = _load_quiz(quiz_path)
+        return table, quiz
+
+    def filter(self, query="", decade=None, tag=None, searcher=None):
+        """Identificadores de los hitos que cumplen los filtros.
+
+        Con texto se buscan todos los hitos que contienen la consulta como
+        subcadena (con ``searcher``, un ``IncrementalSearch``, si se da, para
+        reusar lo ya buscado al escribir); los ``RANK_LIMIT`` más relevantes
+        van primero y el resto después en orden del catálogo. Si no hay
+        ninguna coincidencia exacta se buscan las palabras corregidas.
+        """
+        with self.lock:
+            if not query.strip():
+                ids = self.facets.filter(None, decade, tag)
+                return self.table.all_ids() if ids is None else array("I", ids)
+            ids = self.facets.filter((searcher or self.index).search(query), decade, tag)
+            if ids:
+                return self.ranker.order(query, array("I", ids))
+            # Sin coincidencias exactas: se corrigen los errores de escritura
+            return self.ranker.search(query, self.facets.members(decade, tag))
+
+    def question_bank(self):
+        """Banco de preguntas del catálogo (se crea una vez y se rehace tras ``apply``)"""
+        if self._bank is None:
+            self._bank = QuestionBank(self.table, self.facets)
+        return self._bank
+
+    def generate_quiz(self, seed, length=None):
+        """Cuestionario generado a partir de los hitos; la misma ``seed`` da el mismo cuestionario"""
+        with self.lock:
+            return self.question_bank().quiz(seed, length or QUIZ_LENGTH)
+
+    def diff(self, table):
+        """Cambios de la tabla actual a ``table``: (quitados, cambiados, nuevos).
+
+        Los hitos se emparejan por (año, título): ``quitados`` son
+        identificadores, ``cambiados`` pares (identificador, fila nueva) y
+        ``nuevos`` filas. Cambiar el título cuenta como quitar y agregar.
+        """
+        current = self.table
+        by_key = {}
+        removed = current.removed
+        for i in range(len(current)):
+            if i not in removed:
+                by_key.setdefault((current.years[i], current.titles[i]), []).append(i)
+        changed, added = [], []
+        for k in range(len(table)):
+            row = table.row(k)
+            ids = by_key.get(row[:2])
+            if not ids:
+                added.append(row)
+                continue
+            i = ids.pop(0)
+            old = current.row(i)
+            # Las etiquetas salen en el orden de cada vocabulario: se comparan como conjuntos
+            if (old[2] != row[2] or old[4] != row[4]
+                    or set(old[3]) != set(row[3])):
+                changed.append((i, row))
+        gone = sorted(i for ids in by_key.values() for i in ids)
+        return gone, changed, added
+
+    def apply(self, diff):
+        """Aplica un ``diff`` a la tabla, el índice y las facetas (sólo esos hitos)"""
+        removed, changed, added = diff
+        t = self.table
+        with self.lock:
+            for i in removed:
+                self.facets.discard(i, t.years[i], t.tag_bits[i])
+                self.index.discard(i)
+                self.ranker.discard(i, *t.row(i)[:4])
+                t.remove(i)
+            for i, row in changed:
+                self.facets.discard(i, t.years[i], t.tag_bits[i])
+                self.ranker.update(i, t.row(i), row)
+                t.set_row(i, *row)
+                self.facets.add(i, t.years[i], t.tag_bits[i])
+                self.index.update(i, *row[:4])
+            for row in added:
+                i = t.append(*row)
+                self.facets.add(i, t.years[i], t.tag_bits[i])
+                self.index.add(*row[:4])
+                self.ranker.add(i, *row[:4])
+            self._bank = None
+
+    @staticmethod
+    def cache_path(path, quiz_path=None, cache_dir=CATALOG_CACHE_DIR):
+        """Ruta de la caché: depende de la ruta, tamaño y fecha de los archivos"""
+        source = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:16]
+        key = []
+        for p in (path, quiz_path):
+            if p:
+                st = os.stat(p)
+                key.append(f"{os.path.abspath(p)}|{st.st_mtime_ns}|{st.st_size}")
+        digest = hashlib.sha1("|".join(key).encode("utf-8")).hexdigest()[:16]
+        return os.path.join(cache_dir, f"{source}-{digest}.tlm")
+
+    def save_cache(self, cache_path):
+        """Compila el catálogo a ``cache_path`` (y borra las versiones viejas)"""
+        directory = os.path.dirname(cache_path) or "."
+        os.makedirs(directory, exist_ok=True)
+        t = self.table
+        width = max(1, (len(t.tag_names) + 7) // 8)
+        tmp = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "wb", buffering=EXPORT_BUFFER) as f:
+                f.write(CATALOG_CACHE_MAGIC)
+                w = _CacheWriter(f)
+                w.raw("years", array("i", t.years).tobytes())
+                w.raw("tag_bits", b"".join(bits.to_bytes(width, "little") for bits in t.tag_bits))
+                w.strings("titles", t.titles)
+                w.strings("descriptions", t.descriptions)
+                w.strings("images", t.images)
+                w.strings("blobs", self.index.blobs)
+                grams = list(self.index.grams)
+                w.strings("gram_keys", grams)
+                gram_spans = w.postings("grams", {g: self.index.grams[g] for g in grams})
+                w.raw("gram_spans", array("Q", itertools.chain.from_iterable(
+                    gram_spans[g] for g in grams)).tobytes())
+                ranker = self.ranker
+                terms = list(ranker.docs)
+                w.strings("rank_terms", terms)
+                rank_spans = w.postings("rank_docs", ranker.docs, terms)
+                w.postings("rank_freqs", ranker.freqs, terms, typecode="H")
+                w.raw("rank_spans", array("Q", itertools.chain.from_iterable(
+                    rank_spans[term] for term in terms)).tobytes())
+                w.raw("rank_lengths", ranker.lengths.tobytes())
+                heads = list(ranker.heads)
+                w.strings("rank_heads", heads)
+                w.raw("rank_head_counts", array("I", [ranker.heads[term] for term in heads]).tobytes())
+                decades = w.postings("decades", self.facets.decades)
+                tags = w.postings("tags", self.facets.tags)
+                header = json.dumps({
+                    "version": CATALOG_CACHE_VERSION,
+                    "byteorder": sys.byteorder,
+                    "count": len(t),
+                    "tag_width": width,
+                    "tag_names": t.tag_names,
+                    "decades": {label: span for label, span in decades.items()},
+                    "tags": [[tag_id, a, b] for tag_id, (a, b) in tags.items()],
+                    "sections": w.sections,
+                    "rank_totals": ranker.totals,
+                    "rank_count": ranker.count,
+                    "quiz": self.quiz if self.quiz_is_external else None,
+                }, ensure_ascii=False).encode("utf-8")
+                offset = f.tell()
+                f.write(header)
+                f.write(_TRAILER.pack(offset, CATALOG_CACHE_MAGIC))
+            os.replace(tmp, cache_path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        prefix = os.path.basename(cache_path).split("-")[0] + "-"
+        for name in os.listdir(directory):
+            if name.startswith(prefix) and name.endswith(".tlm") and name != os.path.basename(cache_path):
+                try:
+                    os.remove(os.path.join(directory, name))
+                except OSError:
+                    pass
+
+    @classmethod
+    def open_cache(cls, cache_path, source=None, quiz_path=None):
+        """Mapea en memoria una caché escrita por ``save_cache``"""
+        with open(cache_path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buf = memoryview(mm)
+        if len(buf) < 4 + _TRAILER.size or bytes(buf[:4]) != CATALOG_CACHE_MAGIC:
+            raise ValueError("no es una caché de catálogo")
+        offset, magic = _TRAILER.unpack(buf[len(buf) - _TRAILER.size:])
+        if magic != CATALOG_CACHE_MAGIC:
+            raise ValueError("caché incompleta")
+        header = json.loads(str(buf[offset:len(buf) - _TRAILER.size], "utf-8"))
+        if header["version"] != CATALOG_CACHE_VERSION or header["byteorder"] != sys.byteorder:
+            raise ValueError("versión o arquitectura distinta")
+        sections = header["sections"]
+        count = header["count"]
+
+        def section(name):
+            start, size = sections[name]
+            return buf[start:start + size]
+
+        def strings(name, n):
+            data = section(name)
+            offsets = section(name + ".offsets").cast("Q")
+            return MappedColumn(n, lambda i: str(data[offsets[i]:offsets[i + 1]], "utf-8"))
+
+        years = section("years").cast("i")
+        tag_data = section("tag_bits")
+        width = header["tag_width"]
+        from_bytes = int.from_bytes
+        table = MilestoneTable.from_columns(
+            MappedColumn(count, years.__getitem__),
+            strings("titles", count),
+            strings("descriptions", count),
+            strings("images", count),
+            MappedColumn(count, lambda i: from_bytes(tag_data[i * width:(i + 1) * width], "little")),
+            header["tag_names"])
+
+        gram_count = len(section("gram_keys.offsets")) // 8 - 1
+        gram_keys = strings("gram_keys", gram_count)
+        gram_spans = section("gram_spans").cast("Q")
+        grams = MappedPostings(section("grams"), {
+            gram_keys[k]: (gram_spans[2 * k], gram_spans[2 * k + 1]) for k in range(gram_count)})
+        index = MilestoneIndex.from_postings(strings("blobs", count), grams)
+
+        term_count = len(section("rank_terms.offsets")) // 8 - 1
+        terms = strings("rank_terms", term_count)
+        spans = section("rank_spans").cast("Q")
+        term_spans = {terms[k]: (spans[2 * k], spans[2 * k + 1]) for k in range(term_count)}
+        lengths = array("H")
+        lengths.frombytes(section("rank_lengths"))
+        head_counts = section("rank_head_counts").cast("I")
+        heads = strings("rank_heads", len(head_counts))
+        ranker = RankedIndex.from_postings(
+            MappedPostings(section("rank_docs"), term_spans),
+            MappedPostings(section("rank_freqs"), {term: (RankedIndex.FIELDS * a, RankedIndex.FIELDS * b)
+                                                   for term, (a, b) in term_spans.items()}, "H"),
+            lengths, header["rank_totals"], header["rank_count"],
+            {heads[k]: head_counts[k] for k in range(len(head_counts))})
+
+        decades = MappedPostings(section("decades"),
+                                 {label: tuple(span) for label, span in header["decades"].items()})
+        tags = MappedPostings(section("tags"), {tag_id: (a, b) for tag_id, a, b in header["tags"]})
+        facets = MilestoneFacets.from_postings(decades, tags)
+
+        catalog = cls(table, header["quiz"], facets, index, ranker, source=source, quiz_path=quiz_path)
+        catalog._mmap = mm
+        return catalog
+
+
+# ---------------------------
+# Calificación del cuestionario
+# ---------------------------
+# (porcentaje mínimo, calificación, color), de la más alta a la más baja
+GRADE_BANDS = (
+    (90, "¡Excelente! 🌟", "green"),
+    (70, "¡Muy bien! 👍", "blue"),
+    (50, "Aprobado ✓", "orange"),
+    (0, "Necesitas repasar 📚", "red"),
+)
+
+
+def grade_band(pct):
+    """Calificación y color según el porcentaje de aciertos"""
+    for minimum, grade, color in GRADE_BANDS:
+        if pct >= minimum:
+            return grade, color
+    return GRADE_BANDS[-1][1:]
+
+
+def grade_quiz(questions, answers):
+    """Califica un intento; ``answers[i]`` es la opción elegida en la pregunta ``i`` (-1 = sin responder).
+
+    Retorna un diccionario con ``score``, ``total``, ``pct``, ``grade`` y
+    ``results`` (una tupla (acertó, respuesta, correcta) por pregunta).
+    """
+    results = []
+    for q, user in zip(questions, answers):
+        correct = q["answer"]
+        results.append((user == correct, user, correct))
+    score = sum(ok for ok, _user, _correct in results)
+    pct = round(100 * score / len(questions), 1) if questions else 0.0
+    return {"score": score, "total": len(questions), "pct": pct,
+            "grade": grade_band(pct)[0], "results": results}
+
+
+# ---------------------------
+# Banco de preguntas
+# ---------------------------
+QUIZ_LENGTH = 8      # Preguntas por cuestionario generado
+QUIZ_OPTIONS = 4     # Opciones por pregunta (las que muestra QuizWindow)
+SAMPLE_TRIES = 16    # Sorteos por distractor antes de buscar en todo el catálogo
+
+
+class QuestionBank:
+    """Genera preguntas de año, título y etiqueta a partir de los hitos.
+
+    Los distractores salen de hitos de la misma década, así que son
+    plausibles; si la década no alcanza se buscan en todo el catálogo. Lo que
+    depende del tamaño del catálogo (décadas con sus conteos acumulados) se
+    calcula una vez al crear el banco, sobre las facetas ya construidas;
+    después cada pregunta cuesta un número acotado de sorteos. Con la misma
+    semilla y el mismo catálogo se obtiene el mismo cuestionario.
+    """
+
+    KINDS = ("year", "title", "tag")
+
+    def __init__(self, table: MilestoneTable, facets: MilestoneFacets):
+        self.table = table
+        self.pools = [facets.decades[label] for label, _count in facets.decade_counts()]
+        self.cumulative = list(itertools.accumulate(len(ids) for ids in self.pools))
+
+    def __len__(self):
+        return self.cumulative[-1] if self.cumulative else 0
+
+    def _pick(self, rng):
+        """(hito, década) al azar, uniforme sobre todos los hitos"""
+        k = rng.randrange(len(self))
+        d = bisect.bisect_right(self.cumulative, k)
+        return self.pools[d][k - (self.cumulative[d - 1] if d else 0)], d
+
+    def _distractors(self, rng, d, value_of, exclude, widen=True):
+        """Hasta ``QUIZ_OPTIONS - 1`` valores distintos de ``value_of(rng, hito)``
+        que no estén en ``exclude``, de la década ``d`` (y con ``widen`` de
+        todo el catálogo si la década no alcanza)"""
+        found = []
+        seen = set(exclude)
+        pool = self.pools[d]
+        tries = SAMPLE_TRIES * (QUIZ_OPTIONS - 1)
+        for attempt in range(2 * tries if widen else tries):
+            if len(found) == QUIZ_OPTIONS - 1:
+                break
+            i = pool[rng.randrange(len(pool))] if attempt < tries else self._pick(rng)[0]
+            value = value_of(rng, i)
+            if value is not None and value not in seen:
+                seen.add(value)
+                found.append(value)
+        return found
+
+    def question(self, rng, i, d, kind):
+        """Pregunta de tipo ``kind`` sobre el hito ``i``, o None si no hay distractores suficientes"""
+        t = self.table
+        year, title, desc = t.years[i], t.titles[i], t.descriptions[i]
+        if kind == "year":
+            text = f"¿En qué año ocurrió «{title}»?"
+            correct = year
+            wrong = self._distractors(rng, d, lambda rng, j: t.years[j], [year], widen=False)
+            # Una década con pocos años distintos se completa con años cercanos
+            offsets = list(range(1, 10))
+            rng.shuffle(offsets)
+            for offset in offsets:
+                if len(wrong) == QUIZ_OPTIONS - 1:
+                    break
+                candidate = year + offset * rng.choice((-1, 1))
+                if candidate not in wrong and candidate != year:
+                    wrong.append(candidate)
+            correct, wrong = str(correct), [str(y) for y in wrong]
+        elif kind == "title":
+            if desc:
+                text = f"¿Qué hito se describe así?\n«{desc}»"
+                value_of = lambda rng, j: t.titles[j] if t.descriptions[j] != desc else None
+            else:
+                text = f"¿Qué hito ocurrió en {year}?"
+                value_of = lambda rng, j: t.titles[j] if t.years[j] != year else None
+            correct = title
+            wrong = self._distractors(rng, d, value_of, [title])
+        else:
+            tags = t.tags(i)
+            if not tags:
+                return None
+            text = f"¿Qué etiqueta corresponde a «{title}»?"
+            correct = tags[rng.randrange(len(tags))]
+
+            def value_of(rng, j):
+                other = t.tags(j)
+                return other[rng.randrange(len(other))] if other else None
+
+            wrong = self._distractors(rng, d, value_of, tags)
+        if len(wrong) < QUIZ_OPTIONS - 1:
+            return None
+        options = [correct] + wrong
+        rng.shuffle(options)
+        return {"q": text, "options": options, "answer": options.index(correct)}
+
+    def quiz(self, seed, length=QUIZ_LENGTH):
+        """``length`` preguntas (sin repetir hito) en el formato de ``QUIZ``"""
+        rng = random.Random(seed)
+        questions = []
+        used = set()
+        for _ in range(length * SAMPLE_TRIES if len(self) else 0):
+            if len(questions) == length:
+                break
+            i, d = self._pick(rng)
+            if i in used:
+                continue
+            question = self.question(rng, i, d, self.KINDS[rng.randrange(len(self.KINDS))])
+            if question is not None:
+                used.add(i)
+                questions.append(question)
+        return questions
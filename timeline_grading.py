@@ -0,0 +1,213 @@
+"""
+Calificación por lotes del cuestionario (NumPy)
+Descripción:
+ - Lee miles de intentos como una matriz alumnos × preguntas
+ - En una sola pasada sobre esa matriz calcula, por alumno, puntaje, porcentaje
+   y calificación (las mismas bandas que QuizWindow), y por pregunta la
+   dificultad (proporción de aciertos), la discriminación (grupo alto menos
+   grupo bajo, 27 % cada uno), la correlación punto-biserial corregida, las
+   omisiones y cuántas veces se eligió cada opción
+ - Escribe los reportes por alumno y por pregunta en CSV o JSON (.gz/.xz opcional)
+
+Formatos del archivo de intentos (-1, celda vacía o null = sin responder):
+    CSV:         alumno,p1,p2,...   (una fila por alumno; el encabezado es opcional)
+    JSON:        {"alumno": [0, 1, ...], ...}  o  [[0, 1, ...], ...]
+    JSON Lines:  {"student": "alumno", "answers": [0, 1, ...]} por línea
+
+Uso:
+    python timeline_cli.py grade-batch intentos.csv --students notas.csv --items preguntas.csv
+"""
+import csv
+import json
+
+import numpy as np
+
+from timeline_core import GRADE_BANDS, open_export, split_export_path
+
+UNANSWERED = -1
+ANSWER_MAX = np.iinfo(np.int16).max   # Las respuestas se guardan como int16
+GROUP_FRACTION = 0.27   # Fracción de alumnos en los grupos alto y bajo (discriminación)
+
+
+# ---------------------------
+# Lectura de intentos
+# ---------------------------
+def _answer(cell, where):
+    cell = cell.strip()
+    if not cell:
+        return UNANSWERED
+    try:
+        return int(cell)
+    except ValueError:
+        raise ValueError(f"{where}: respuesta no válida {cell!r}")
+
+
+def _read_csv(f):
+    names, rows = [], []
+    for n, row in enumerate(csv.reader(f), 1):
+        if not row:
+            continue
+        if n == 1 and not all(c.strip().lstrip("-").isdigit() for c in row[1:] if c.strip()):
+            continue   # Encabezado
+        names.append(row[0])
+        rows.append([_answer(c, f"fila {n}") for c in row[1:]])
+    return names, rows
+
+
+def _read_json(data):
+    if isinstance(data, dict):
+        return list(data), list(data.values())
+    return [str(i + 1) for i in range(len(data))], data
+
+
+def _read_jsonl(f):
+    names, rows = [], []
+    for n, line in enumerate(f, 1):
+        if line.strip():
+            record = json.loads(line)
+            if not isinstance(record, dict) or "answers" not in record:
+                raise ValueError(f"línea {n}: falta \"answers\"")
+            names.append(str(record.get("student", n)))
+            rows.append(record["answers"])
+    return names, rows
+
+
+def _check_row(name, row, n_questions):
+    """Respuestas de ``row`` como enteros de int16; ValueError si alguna no lo es"""
+    if not isinstance(row, list):
+        raise ValueError(f"{name}: se esperaba una lista de respuestas, no {row!r}")
+    if len(row) != n_questions:
+        raise ValueError(f"{name}: {len(row)} respuestas para {n_questions} preguntas")
+    checked = []
+    for cell in row:
+        if cell is None:
+            cell = UNANSWERED
+        elif (isinstance(cell, bool) or not isinstance(cell, int)
+              or not -ANSWER_MAX <= cell <= ANSWER_MAX):
+            raise ValueError(f"{name}: respuesta no válida {cell!r}")
+        checked.append(cell)
+    return checked
+
+
+def load_submissions(path, n_questions):
+    """``(nombres, respuestas)`` de ``path``; respuestas es una matriz int16 alumnos × preguntas"""
+    ext, compression = split_export_path(path)
+    with open_export(path, "r", compression) as f:
+        if ext == ".csv":
+            names, rows = _read_csv(f)
+        elif ext == ".jsonl":
+            names, rows = _read_jsonl(f)
+        elif ext == ".json":
+            names, rows = _read_json(json.load(f))
+        else:
+            raise ValueError(f"Formato de intentos no reconocido: {path} (use .csv, .json o .jsonl)")
+    rows = [_check_row(name, row, n_questions) for name, row in zip(names, rows)]
+    answers = np.array(rows, dtype=np.int16).reshape(len(rows), n_questions)
+    return names, answers
+
+
+# ---------------------------
+# Calificación
+# ---------------------------
+class BatchReport:
+    """Resultado de ``grade_batch``: arreglos por alumno y por pregunta"""
+
+    def __init__(self, questions, names, answers):
+        self.questions = questions
+        self.names = names
+        self.answers = answers
+        n, k = answers.shape
+        self.total = k
+
+        key = np.array([q["answer"] for q in questions], dtype=np.int16)
+        correct = answers == key                      # (alumnos, preguntas)
+        hits = correct.astype(np.float64)
+
+        # --- Por alumno ---
+        self.scores = correct.sum(axis=1)
+        self.pct = np.round(100 * self.scores / k, 1)
+        # Índice en GRADE_BANDS: bandas con mínimo <= pct, contadas desde la más baja
+        minimums = np.array([band[0] for band in reversed(GRADE_BANDS)])
+        self.band = len(GRADE_BANDS) - np.searchsorted(minimums, self.pct, side="right")
+
+        # --- Por pregunta ---
+        self.difficulty = hits.mean(axis=0)
+        self.omitted = (answers == UNANSWERED).mean(axis=0)
+        group = max(1, int(round(GROUP_FRACTION * n)))
+        order = np.argsort(-self.scores, kind="stable")
+        self.discrimination = hits[order[:group]].mean(axis=0) - hits[order[-group:]].mean(axis=0)
+        # Correlación de cada pregunta con el puntaje del resto (sin la propia pregunta)
+        rest = self.scores[:, None] - hits
+        x = hits - self.difficulty
+        y = rest - rest.mean(axis=0)
+        cov = (x * y).sum(axis=0)
+        norm = np.sqrt((x * x).sum(axis=0) * (y * y).sum(axis=0))
+        self.point_biserial = np.divide(cov, norm, out=np.full(k, np.nan), where=norm > 0)
+        # Veces que se eligió cada opción (distractores que nadie elige no aportan)
+        width = max((len(q["options"]) for q in questions), default=0)
+        sizes = np.array([len(q["options"]) for q in questions])
+        valid = (answers >= 0) & (answers < sizes)
+        flat = (np.arange(k) * width + answers)[valid]
+        self.option_counts = np.bincount(flat, minlength=k * width).reshape(k, width)
+
+    def student_rows(self):
+        """Un diccionario por alumno (score, total, pct, grade)"""
+        grades = [band[1] for band in GRADE_BANDS]
+        return [{"student": name, "score": int(score), "total": self.total, "pct": float(pct),
+                 "grade": grades[band]}
+                for name, score, pct, band in zip(self.names, self.scores.tolist(),
+                                                  self.pct.tolist(), self.band.tolist())]
+
+    def item_rows(self):
+        """Un diccionario por pregunta con sus estadísticas"""
+        rows = []
+        for j, q in enumerate(self.questions):
+            pb = self.point_biserial[j]
+            rows.append({
+                "question": j + 1, "text": q["q"], "answer": q["answer"],
+                "difficulty": round(float(self.difficulty[j]), 4),
+                "discrimination": round(float(self.discrimination[j]), 4),
+                "point_biserial": None if np.isnan(pb) else round(float(pb), 4),
+                "omitted": round(float(self.omitted[j]), 4),
+                "options": self.option_counts[j, :len(q["options"])].tolist(),
+            })
+        return rows
+
+    def summary(self):
+        counts = np.bincount(self.band, minlength=len(GRADE_BANDS))
+        return {"students": len(self.names), "questions": self.total,
+                "mean_pct": round(float(self.pct.mean()), 1),
+                "median_pct": round(float(np.median(self.pct)), 1),
+                "grades": {band[1]: int(c) for band, c in zip(GRADE_BANDS, counts)}}
+
+
+def grade_batch(questions, answers, names=None):
+    """Califica todos los intentos de ``answers`` (alumnos × preguntas) contra ``questions``"""
+    answers = np.asarray(answers, dtype=np.int16)
+    if answers.ndim != 2 or answers.shape[1] != len(questions):
+        raise ValueError(f"Se esperaban intentos de {len(questions)} respuestas")
+    if not len(answers) or not len(questions):
+        raise ValueError("No hay intentos ni preguntas que calificar")
+    if names is None:
+        names = [str(i + 1) for i in range(len(answers))]
+    return BatchReport(questions, names, answers)
+
+
+# ---------------------------
+# Reportes
+# ---------------------------
+def write_rows(path, rows):
+    """Escribe ``rows`` (diccionarios) como CSV o JSON según la extensión de ``path``"""
+    ext, compression = split_export_path(path)
+    if ext not in (".csv", ".json"):
+        raise ValueError(f"Formato de reporte no reconocido: {path} (use .csv o .json)")
+    with open_export(path, "w", compression) as f:
+        if ext == ".json":
+            json.dump(rows, f, ensure_ascii=False, indent=2)
+            return
+        w = csv.writer(f)
+        if rows:
+            w.writerow(rows[0])
+        for row in rows:
+            w.writerow(";".join(map(str, v)) if isinstance(v, list) else ("" if v is None else v)
+                       for v in row.values())
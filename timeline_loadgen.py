@@ -0,0 +1,254 @@
+"""
+Generador de carga para timeline_server.py
+Descripción:
+ - Abre N conexiones persistentes (asyncio) y repite peticiones durante un tiempo fijo
+ - Mezcla búsquedas, facetas, detalle de hitos y miniaturas; las búsquedas siguen
+   una popularidad tipo Zipf (pocas consultas muy repetidas, muchas raras)
+ - Con --revalidate reenvía el último ETag de cada ruta (If-None-Match)
+ - Reporta peticiones por segundo, percentiles de latencia, códigos de estado y
+   aciertos de la caché del servidor (encabezado X-Cache)
+
+Uso:
+    python timeline_server.py &
+    python timeline_loadgen.py --connections 64 --duration 10
+    python timeline_loadgen.py --mix search=1 --revalidate --json carga.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import sys
+import time
+from collections import Counter, defaultdict
+from urllib.parse import quote, urlsplit
+
+URL = "http://127.0.0.1:8765"
+CONNECTIONS = 32
+DURATION_S = 10.0
+MIX = "search=70,facets=10,item=15,thumb=5"
+QUERY_POOL = 2000   # Consultas distintas en la mezcla
+ZIPF_S = 1.1        # Exponente de popularidad de las consultas
+
+
+# ---------------------------
+# Cliente HTTP mínimo
+# ---------------------------
+class Connection:
+    """Conexión HTTP/1.1 persistente; se reabre si el servidor la cierra"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = self.writer = None
+
+    async def get(self, target, headers=()):
+        """``(estado, encabezados, cuerpo)`` de ``GET target``"""
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        lines = [f"GET {target} HTTP/1.1", f"Host: {self.host}:{self.port}"]
+        lines += [f"{name}: {value}" for name, value in headers]
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        try:
+            head = await self.reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, ConnectionError):
+            self.close()
+            raise ConnectionError("el servidor cerró la conexión")
+        status_line, *header_lines = head.decode("latin-1").split("\r\n")
+        response_headers = {}
+        for line in header_lines:
+            if line:
+                name, _, value = line.partition(":")
+                response_headers[name.strip().lower()] = value.strip()
+        body = await self.reader.readexactly(int(response_headers.get("content-length", 0)))
+        if response_headers.get("connection", "").lower() == "close":
+            self.close()
+        return int(status_line.split(" ")[1]), response_headers, body
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+
+# ---------------------------
+# Mezcla de peticiones
+# ---------------------------
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ("search", "facets", "item", "thumb"):
+            raise SystemExit(f"Tipo de petición desconocido en --mix: {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+async def discover(conn: Connection):
+    """Hitos, palabras y etiquetas del servidor, para armar peticiones reales"""
+    _, _, body = await conn.get("/search?limit=500")
+    items = json.loads(body)["items"]
+    _, _, body = await conn.get("/facets?tags=0")
+    facets = json.loads(body)
+    ids = [item["id"] for item in items]
+    with_thumbs = []
+    for i in ids[:100]:
+        _, _, body = await conn.get(f"/items/{i}")
+        if json.loads(body).get("thumbnail"):
+            with_thumbs.append(i)
+    words = sorted({w for item in items for w in re.findall(r"\w{3,}", item["title"].lower())})
+    return ids, with_thumbs, words, list(facets["decades"]), list(facets["tags"])
+
+
+def make_queries(rng, words, decades, tags, count=QUERY_POOL):
+    """Destinos de búsqueda distintos, del más popular al menos popular"""
+    queries = []
+    seen = set()
+    for _ in range(count * 4):
+        if len(queries) >= count:
+            break
+        params = []
+        text = " ".join(rng.sample(words, min(len(words), rng.choice((1, 1, 2)))))
+        if rng.random() < 0.3:
+            text = text[:max(2, len(text) - rng.randint(0, 3))]   # Escribiendo todavía
+        if text:
+            params.append("q=" + quote(text))
+        if decades and rng.random() < 0.2:
+            params.append("decade=" + rng.choice(decades))
+        if tags and rng.random() < 0.1:
+            params.append("tag=" + quote(rng.choice(tags)))
+        target = "/search?" + "&".join(params)
+        if target not in seen:
+            seen.add(target)
+            queries.append(target)
+    return queries
+
+
+class Workload:
+    def __init__(self, rng, mix, ids, with_thumbs, queries):
+        self.rng = rng
+        kinds = [k for k in mix if mix[k] > 0 and (k != "thumb" or with_thumbs) and (k != "item" or ids)]
+        if not kinds:
+            raise SystemExit("La mezcla no tiene peticiones posibles en este servidor")
+        self.kinds = kinds
+        self.kind_weights = [mix[k] for k in kinds]
+        self.ids = ids
+        self.with_thumbs = with_thumbs
+        self.queries = queries
+        self.query_weights = list(_zipf_cumulative(len(queries)))
+
+    def next(self):
+        kind = self.rng.choices(self.kinds, self.kind_weights)[0]
+        if kind == "search":
+            return kind, self.rng.choices(self.queries, cum_weights=self.query_weights)[0]
+        if kind == "facets":
+            return kind, "/facets"
+        if kind == "item":
+            return kind, f"/items/{self.rng.choice(self.ids)}"
+        return kind, f"/thumbs/{self.rng.choice(self.with_thumbs)}.png"
+
+
+def _zipf_cumulative(n, s=ZIPF_S):
+    total = 0.0
+    for rank in range(1, n + 1):
+        total += 1 / rank ** s
+        yield total
+
+
+# ---------------------------
+# Medición
+# ---------------------------
+def percentile(samples, p):
+    ordered = sorted(samples)
+    k = max(0, min(len(ordered) - 1, round(p / 100 * len(ordered) + 0.5) - 1))
+    return ordered[k]
+
+
+async def worker(host, port, workload, deadline, revalidate, results):
+    conn = Connection(host, port)
+    etags = {}
+    try:
+        while time.perf_counter() < deadline:
+            kind, target = workload.next()
+            headers = [("If-None-Match", etags[target])] if revalidate and target in etags else ()
+            t0 = time.perf_counter()
+            try:
+                status, response_headers, _ = await conn.get(target, headers)
+            except (ConnectionError, OSError):
+                results["errors"] += 1
+                conn.close()
+                continue
+            results["latency"][kind].append((time.perf_counter() - t0) * 1000)
+            results["status"][status] += 1
+            results["origin"][response_headers.get("x-cache", "?")] += 1
+            if revalidate and "etag" in response_headers:
+                etags[target] = response_headers["etag"]
+    finally:
+        conn.close()
+
+
+async def run(args):
+    split = urlsplit(args.url)
+    host, port = split.hostname or "127.0.0.1", split.port or 80
+    rng = random.Random(args.seed)
+    try:
+        ids, with_thumbs, words, decades, tags = await discover(Connection(host, port))
+    except (ConnectionError, OSError) as e:
+        raise SystemExit(f"No se pudo conectar con {args.url}: {e}")
+    workload = Workload(rng, parse_mix(args.mix), ids, with_thumbs, make_queries(rng, words, decades, tags))
+    results = {"latency": defaultdict(list), "status": Counter(), "origin": Counter(), "errors": 0}
+    start = time.perf_counter()
+    deadline = start + args.duration
+    await asyncio.gather(*(worker(host, port, workload, deadline, args.revalidate, results)
+                           for _ in range(args.connections)))
+    return results, time.perf_counter() - start
+
+
+def summarize(results, elapsed):
+    all_samples = [ms for samples in results["latency"].values() for ms in samples]
+    report = {"requests": len(all_samples), "seconds": round(elapsed, 3),
+              "rps": round(len(all_samples) / elapsed, 1), "errors": results["errors"],
+              "status": dict(results["status"]), "cache": dict(results["origin"]), "latency_ms": {}}
+    for kind, samples in sorted(results["latency"].items()) + [("total", all_samples)]:
+        if samples:
+            report["latency_ms"][kind] = {
+                "n": len(samples), "p50": round(percentile(samples, 50), 3),
+                "p90": round(percentile(samples, 90), 3), "p99": round(percentile(samples, 99), 3),
+                "max": round(max(samples), 3)}
+    return report
+
+
+def print_report(report, args):
+    print(f"\n🚀 {args.url}  {args.connections} conexiones, {report['seconds']:.1f} s")
+    print(f"   {report['requests']:,} peticiones  →  {report['rps']:,.1f} peticiones/s"
+          f"  (errores: {report['errors']})")
+    print(f"   estados: {report['status']}   caché: {report['cache']}")
+    print(f"   {'ruta':<10}{'n':>9}{'p50 ms':>11}{'p90 ms':>11}{'p99 ms':>11}{'max ms':>11}")
+    for kind, st in report["latency_ms"].items():
+        print(f"   {kind:<10}{st['n']:>9,}{st['p50']:>11.3f}{st['p90']:>11.3f}{st['p99']:>11.3f}{st['max']:>11.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generador de carga para timeline_server.py")
+    parser.add_argument("--url", default=URL, help=f"servidor (por omisión {URL})")
+    parser.add_argument("--connections", type=int, default=CONNECTIONS, help="conexiones simultáneas")
+    parser.add_argument("--duration", type=float, default=DURATION_S, help="segundos de carga")
+    parser.add_argument("--mix", default=MIX, help=f"pesos por tipo de petición (por omisión {MIX})")
+    parser.add_argument("--revalidate", action="store_true",
+                        help="enviar If-None-Match con el último ETag de cada ruta")
+    parser.add_argument("--seed", type=int, default=0, help="semilla de la mezcla de peticiones")
+    parser.add_argument("--json", metavar="RUTA", help="guardar el reporte en JSON")
+    args = parser.parse_args()
+
+    results, elapsed = asyncio.run(run(args))
+    report = summarize(results, elapsed)
+    print_report(report, args)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 Reporte guardado en {args.json}")
+    return 1 if report["errors"] or not report["requests"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
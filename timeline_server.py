@@ -0,0 +1,457 @@
+"""
+Servicio HTTP local de la línea del tiempo
+Descripción:
+ - Un solo proceso con asyncio atiende a muchos navegadores a la vez
+ - El catálogo (tabla, índices y facetas) se carga una vez y queda en memoria
+ - Respuestas JSON con ETag (304 si no cambiaron) y caché LRU limitada en bytes
+ - Miniaturas pre-generadas al arrancar (si existe Pillow y archivos en ./assets/)
+ - Con --watch el catálogo externo se recarga al cambiar su archivo
+
+Rutas (GET o HEAD):
+    /search?q=texto&decade=1990s&tag=GPU&offset=0&limit=20
+    /facets?tags=40
+    /items/<id>
+    /thumbs/<id>.png
+
+Uso:
+    python timeline_server.py --port 8765 [--catalog hitos.csv] [--watch]
+    python timeline_loadgen.py --url http://127.0.0.1:8765   (mide el rendimiento)
+"""
+import argparse
+import asyncio
+import hashlib
+import io
+import json
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qsl, quote, unquote, urlencode, urlsplit
+
+from timeline_core import TRACER, Catalog, export_record
+
+# Intento opcional de cargar Pillow para las miniaturas
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except Exception:
+    PIL_AVAILABLE = False
+
+HOST = "127.0.0.1"
+PORT = 8765
+RESPONSE_CACHE_BYTES = 32 * 1024 * 1024   # Memoria máxima de la caché de respuestas
+THUMB_SIZE = (480, 270)                   # Tamaño máximo de las miniaturas servidas
+SEARCH_LIMIT = 20                         # Resultados por página si no se pide otro
+SEARCH_MAX_LIMIT = 500                    # Máximo de resultados por página
+FACET_TAGS = 40                           # Etiquetas por omisión en /facets
+WATCH_INTERVAL = 1.0                      # Segundos entre revisiones del catálogo (--watch)
+MAX_HEADER_BYTES = 16 * 1024              # Tamaño máximo de la línea de petición y encabezados
+KEEP_ALIVE_TIMEOUT = 15                   # Segundos de espera entre peticiones de una conexión
+
+REASONS = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 431: "Request Header Fields Too Large",
+           500: "Internal Server Error"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message=None):
+        super().__init__(message or REASONS[status])
+        self.status = status
+
+
+# ---------------------------
+# Caché de respuestas
+# ---------------------------
+class ResponseCache:
+    """Caché LRU de respuestas ya serializadas, limitada en bytes.
+
+    Cada entrada es ``(cuerpo, tipo, etag, cache_control)``; la clave es la ruta con los
+    parámetros ordenados, así que ``?a=1&b=2`` y ``?b=2&a=1`` comparten entrada.
+    """
+
+    def __init__(self, max_bytes=RESPONSE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key, entry):
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.bytes -= len(old[0])
+        if len(entry[0]) > self.max_bytes:
+            return
+        self.entries[key] = entry
+        self.bytes += len(entry[0])
+        while self.bytes > self.max_bytes:
+            _, old = self.entries.popitem(last=False)
+            self.bytes -= len(old[0])
+
+    def clear(self):
+        self.entries.clear()
+        self.bytes = 0
+
+
+def make_entry(body: bytes, content_type: str, cache_control="no-cache"):
+    """Entrada de caché; el ETag es un hash del cuerpo"""
+    return body, content_type, '"' + hashlib.sha1(body).hexdigest()[:20] + '"', cache_control
+
+
+def json_entry(data):
+    body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return make_entry(body, "application/json; charset=utf-8")
+
+
+# ---------------------------
+# Miniaturas pre-generadas
+# ---------------------------
+def _render_thumbnail(src, size):
+    try:
+        with Image.open(src) as im:
+            im.thumbnail(size)
+            out = io.BytesIO()
+            im.save(out, format="PNG", optimize=True)
+            return out.getvalue()
+    except Exception as e:
+        print(f"Error generando miniatura de {src}: {e}")
+        return None
+
+
+def prerender_thumbnails(catalog: Catalog, asset_dir="assets", size=THUMB_SIZE, workers=None):
+    """PNG reducidos de las imágenes del catálogo, {nombre de imagen: bytes}.
+
+    Se generan en paralelo (un proceso por núcleo); sin Pillow no hay miniaturas.
+    """
+    if not PIL_AVAILABLE:
+        return {}
+    names = sorted({name for name in catalog.table.images if name
+                    and os.path.exists(os.path.join(asset_dir, name))})
+    if not names:
+        return {}
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        rendered = pool.map(_render_thumbnail, [os.path.join(asset_dir, n) for n in names],
+                            [size] * len(names))
+        return {name: png for name, png in zip(names, rendered) if png}
+
+
+# ---------------------------
+# Servicio
+# ---------------------------
+class TimelineService:
+    """Resuelve las rutas sobre un catálogo en memoria, con caché de respuestas"""
+
+    def __init__(self, catalog: Catalog, thumbnails=None, cache: ResponseCache = None):
+        self.catalog = catalog
+        self.thumbnails = thumbnails or {}
+        self.cache = cache or ResponseCache()
+        self.generation = 0   # Aumenta al recargar el catálogo
+        self.requests = 0
+
+    # --- Rutas ---
+    def route(self, path, params):
+        """Entrada de caché de la ruta; lanza HTTPError si no existe"""
+        if path == "/search":
+            return self.search(params)
+        if path == "/facets":
+            return self.facets(params)
+        if path.startswith("/items/"):
+            return self.item(self._item_id(path[len("/items/"):]))
+        if path.startswith("/thumbs/") and path.endswith(".png"):
+            return self.thumbnail(self._item_id(path[len("/thumbs/"):-len(".png")]))
+        if path == "/":
+            return json_entry({"routes": ["/search?q=&decade=&tag=&offset=&limit=", "/facets?tags=",
+                                          "/items/<id>", "/thumbs/<id>.png"],
+                               "milestones": len(self.catalog.table.all_ids())})
+        raise HTTPError(404)
+
+    def search(self, params):
+        catalog = self.catalog
+        offset = self._int(params, "offset", 0)
+        limit = min(self._int(params, "limit", SEARCH_LIMIT), SEARCH_MAX_LIMIT)
+        tag = params.get("tag")
+        tag_id = None
+        if tag:
+            tag_id = catalog.table.tag_ids.get(tag)
+            if tag_id is None:
+                return json_entry({"total": 0, "offset": offset, "items": []})
+        ids = catalog.filter(params.get("q", ""), params.get("decade") or None, tag_id)
+        t = catalog.table
+        items = [{"id": i, "year": t.years[i], "title": t.titles[i], "tags": t.tags(i)}
+                 for i in ids[offset:offset + limit]]
+        return json_entry({"total": len(ids), "offset": offset, "items": items})
+
+    def facets(self, params):
+        catalog = self.catalog
+        with catalog.lock:
+            decades = catalog.facets.decade_counts()
+            tags = catalog.facets.tag_counts(self._int(params, "tags", FACET_TAGS))
+        return json_entry({"decades": dict(decades),
+                           "tags": {catalog.table.tag_names[tag_id]: count for tag_id, count in tags}})
+
+    def item(self, i):
+        t = self.catalog.table
+        record = dict(id=i, **export_record(t, i))
+        record["thumbnail"] = f"/thumbs/{i}.png" if t.images[i] in self.thumbnails else None
+        return json_entry(record)
+
+    def thumbnail(self, i):
+        png = self.thumbnails.get(self.catalog.table.images[i])
+        if png is None:
+            raise HTTPError(404)
+        return make_entry(png, "image/png", "max-age=3600")
+
+    def _item_id(self, text):
+        t = self.catalog.table
+        if not text.isdigit() or int(text) >= len(t.years) or int(text) in t.removed:
+            raise HTTPError(404)
+        return int(text)
+
+    @staticmethod
+    def _int(params, name, default):
+        try:
+            value = int(params.get(name, default))
+        except ValueError:
+            raise HTTPError(400, f"{name} debe ser un entero")
+        if value < 0:
+            raise HTTPError(400, f"{name} no puede ser negativo")
+        return value
+
+    # --- Caché ---
+    @staticmethod
+    def parse_target(target):
+        """``(clave de caché, ruta, parámetros)`` del destino de la petición"""
+        split = urlsplit(target)
+        path = unquote(split.path)
+        params = dict(parse_qsl(split.query))
+        # Se vuelven a escapar: "q%3Dx" y "q=x" no deben compartir la clave
+        return quote(path) + "?" + urlencode(sorted(params.items())), path, params
+
+    def cached(self, key):
+        self.requests += 1
+        return self.cache.get(key)
+
+    def build(self, path, params):
+        """Genera la respuesta de ``path`` (se llama fuera del bucle de eventos)"""
+        with TRACER.span("server.route"):
+            return self.route(path, params)
+
+    def invalidate(self):
+        """Vacía la caché; las respuestas que se estaban generando ya no se guardan"""
+        self.generation += 1
+        self.cache.clear()
+
+    def stats(self):
+        return {"requests": self.requests, "cache_hits": self.cache.hits,
+                "cache_entries": len(self.cache.entries), "cache_bytes": self.cache.bytes}
+
+
+# ---------------------------
+# Servidor HTTP (asyncio)
+# ---------------------------
+class TimelineServer:
+    """HTTP/1.1 mínimo con conexiones persistentes sobre ``asyncio.start_server``.
+
+    Las respuestas en caché se envían sin salir del bucle de eventos; las que
+    faltan se generan en un hilo aparte para no frenar a las demás conexiones,
+    y si varias conexiones piden la misma ruta a la vez se genera una sola vez.
+    """
+
+    def __init__(self, service: TimelineService, host=HOST, port=PORT, asset_dir="assets"):
+        self.service = service
+        self.host = host
+        self.port = port
+        self.asset_dir = asset_dir
+        self._pending = {}   # Clave -> future de las respuestas que se están generando
+
+    async def serve_forever(self, watch=False):
+        server = await asyncio.start_server(self.handle, self.host, self.port, limit=MAX_HEADER_BYTES)
+        tasks = [asyncio.ensure_future(self.watch())] if watch else []
+        print(f"🌐 Sirviendo en http://{self.host}:{self.port}/ (Ctrl+C para terminar)")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), KEEP_ALIVE_TIMEOUT)
+                except asyncio.LimitOverrunError:
+                    await self.send_error(writer, HTTPError(431), "HEAD", False)
+                    break
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    break
+                if not await self.serve(head, writer):
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, head, writer):
+        """Atiende una petición; retorna si la conexión sigue abierta"""
+        start = time.perf_counter()
+        try:
+            request_line, *header_lines = head.decode("latin-1").split("\r\n")
+            method, target, version = request_line.split(" ")
+            headers = {}
+            for line in header_lines:
+                if line:
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip()
+        except ValueError:
+            await self.send_error(writer, HTTPError(400), "GET", False)
+            return False
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+        if method not in ("GET", "HEAD"):
+            # Sin soporte para cuerpos: se cierra la conexión en vez de leerlos
+            await self.send_error(writer, HTTPError(405), method, False)
+            return False
+        try:
+            entry, origin = await self.lookup(target)
+        except HTTPError as e:
+            await self.send_error(writer, e, method, keep_alive)
+            return keep_alive
+        except Exception as e:
+            print(f"Error atendiendo {target}: {e!r}")
+            await self.send_error(writer, HTTPError(500), method, False)
+            return False
+        body, content_type, etag, cache_control = entry
+        if etag in headers.get("if-none-match", ""):
+            status, body = 304, b""
+        else:
+            status = 200
+        self.send(writer, status, body if method == "GET" else b"", keep_alive, [
+            ("Content-Type", content_type), ("ETag", etag), ("Cache-Control", cache_control),
+            ("X-Cache", origin)], length=len(body))
+        await writer.drain()
+        TRACER.record("server.request", start)
+        return keep_alive
+
+    async def lookup(self, target):
+        """``(entrada, origen)`` de la respuesta; origen es "hit", "miss" o "shared"
+
+        ("shared": otra conexión ya la estaba generando).
+        """
+        service = self.service
+        key, path, params = service.parse_target(target)
+        entry = service.cached(key)
+        if entry is not None:
+            return entry, "hit"
+        future = self._pending.get(key)
+        if future is not None:
+            return await asyncio.shield(future), "shared"
+        generation = service.generation
+        future = self._pending[key] = asyncio.get_running_loop().run_in_executor(
+            None, service.build, path, params)
+        try:
+            entry = await future
+        finally:
+            del self._pending[key]
+        if generation == service.generation:
+            service.cache.put(key, entry)
+        return entry, "miss"
+
+    async def send_error(self, writer, error: HTTPError, method, keep_alive):
+        body = json.dumps({"error": str(error)}, ensure_ascii=False).encode("utf-8")
+        self.send(writer, error.status, body if method == "GET" else b"", keep_alive,
+                  [("Content-Type", "application/json; charset=utf-8")], length=len(body))
+        await writer.drain()
+
+    @staticmethod
+    def send(writer, status, body, keep_alive, headers, length):
+        lines = [f"HTTP/1.1 {status} {REASONS[status]}"]
+        lines += [f"{name}: {value}" for name, value in headers]
+        lines.append(f"Content-Length: {length if status != 304 else 0}")
+        lines.append("Access-Control-Allow-Origin: *")
+        lines.append("Connection: " + ("keep-alive" if keep_alive else "close"))
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+
+    # --- Recarga del catálogo ---
+    def _stat(self):
+        try:
+            st = os.stat(self.service.catalog.source)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    async def watch(self, interval=WATCH_INTERVAL):
+        """Aplica los cambios del archivo del catálogo y vacía la caché de respuestas"""
+        catalog = self.service.catalog
+        loop = asyncio.get_running_loop()
+        stamp = self._stat()
+        while True:
+            await asyncio.sleep(interval)
+            current = self._stat()
+            if current is None or current == stamp:
+                continue
+            try:
+                table, _ = await loop.run_in_executor(None, Catalog.read, catalog.source)
+                diff = await loop.run_in_executor(None, catalog.diff, table)
+            except Exception as e:
+                # P. ej. el archivo se está guardando: se reintenta en la siguiente revisión
+                print(f"No se pudo recargar el catálogo: {e}")
+                continue
+            stamp = current
+            await loop.run_in_executor(None, catalog.apply, diff)
+            self.service.thumbnails = await loop.run_in_executor(
+                None, prerender_thumbnails, catalog, self.asset_dir)
+            self.service.invalidate()
+            removed, changed, added = diff
+            print(f"🔄 Catálogo recargado: {len(added)} nuevos, {len(changed)} cambiados, {len(removed)} quitados")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servicio HTTP local de la línea del tiempo")
+    parser.add_argument("--host", default=HOST, help=f"dirección de escucha (por omisión {HOST})")
+    parser.add_argument("--port", type=int, default=PORT, help=f"puerto (por omisión {PORT})")
+    parser.add_argument("--catalog", metavar="RUTA", help="catálogo de hitos externo (CSV/JSON)")
+    parser.add_argument("--quiz", metavar="RUTA", help="cuestionario externo (JSON)")
+    parser.add_argument("--assets", metavar="DIR", default="assets", help="carpeta de imágenes")
+    parser.add_argument("--cache-mb", type=int, default=RESPONSE_CACHE_BYTES // (1024 * 1024),
+                        help="memoria máxima de la caché de respuestas, en MB")
+    parser.add_argument("--watch", action="store_true", help="recargar el catálogo externo al cambiar")
+    parser.add_argument("--trace", metavar="RUTA",
+                        help="mide los tiempos de cada petición y guarda la traza JSON al salir")
+    args = parser.parse_args()
+    if args.watch and not args.catalog:
+        parser.error("--watch requiere --catalog")
+    if args.trace:
+        TRACER.enabled = True
+
+    start = time.perf_counter()
+    try:
+        catalog = Catalog.load(args.catalog, args.quiz) if args.catalog else Catalog.builtin(args.quiz)
+    except (OSError, ValueError) as e:
+        raise SystemExit(f"No se pudo cargar el catálogo {args.catalog or args.quiz}: {e}")
+    thumbnails = prerender_thumbnails(catalog, args.assets)
+    print(f"📚 {len(catalog.table.all_ids())} hitos y {len(thumbnails)} miniaturas listos "
+          f"en {time.perf_counter() - start:.2f} s")
+    service = TimelineService(catalog, thumbnails, ResponseCache(args.cache_mb * 1024 * 1024))
+    server = TimelineServer(service, args.host, args.port, args.assets)
+    try:
+        asyncio.run(server.serve_forever(args.watch))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"📊 {service.stats()}")
+        if args.trace:
+            print(f"📈 Traza guardada en {args.trace} ({TRACER.dump(args.trace)} spans)")
+
+
+if __name__ == "__main__":
+    main()